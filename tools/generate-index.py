@@ -1,36 +1,253 @@
 #!/usr/bin/env python3
 """
 Script to generate clangd index by mimicking VS Code's initialization sequence.
-Automatically exits when clang        # Use same arguments as VS Code (from the log analysis)
-        args = [
-            self.clangd_path,
-            "--background-index",  # Fixed: not --background-index=true
-            "--clang-tidy",
-            "--completion-style=detailed",
-            "--log=verbose",  # To see indexing messages
-            "--query-driver=**",  # Allow querying all drivers
-            # Pass build directory to clangd
-            f"--compile-commands-dir={self.build_directory}"
-        ]indexing.
+Automatically exits when clangd finishes indexing.
+
+The LSP transport runs on a single asyncio event loop: stdout, stderr and the
+completion watcher are cooperative tasks, so no reader threads or locks are
+needed.
 """
 
+import asyncio
+import atexit
+import collections
+import hashlib
 import json
+import mmap
 import subprocess
-import threading
 import time
 import os
+import re
 import sys
 import shutil
+import signal
+import stat
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any
+from urllib.parse import urlparse, unquote
+
+# JSON-RPC payloads are encoded and decoded through _dumps()/_loads() so the
+# backend can be swapped in one place; orjson is used when installed
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _JSON_ENCODER = json.JSONEncoder()
+    _JSON_DECODER = json.JSONDecoder()
+
+    def _dumps(obj: Any) -> bytes:
+        """Encode a JSON-RPC payload with the shared stdlib encoder"""
+        return _JSON_ENCODER.encode(obj).encode('utf-8')
+
+    def _loads(data: bytes) -> Any:
+        """Decode a JSON-RPC payload with the shared stdlib decoder"""
+        return _JSON_DECODER.decode(data.decode('utf-8'))
+
+# Streaming parser for large compilation databases (optional)
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Databases above this size are streamed when ijson is available
+_STREAMING_THRESHOLD = 50 * 1024 * 1024
+# Databases above this size are scanned for the two fields instead of being
+# fully decoded
+_SCAN_THRESHOLD = 20 * 1024 * 1024
+# Databases above this size are scanned through a read-only memory map
+_MMAP_THRESHOLD = 32 * 1024 * 1024
+
+# The string value following a key, matched right after the key's closing quote
+_VALUE_RE = re.compile(rb'\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+
+
+def _scan_values(data, key: bytes):
+    """Yield the decoded string values of every `key` in raw JSON bytes
+
+    Occurrences are located with bytes.find; a match preceded by a backslash
+    is an escaped quote inside another string (e.g. -DNAME=\\"file\\") and one
+    not followed by ':' is a plain array element, so both are skipped.
+    """
+    find = data.find
+    match = _VALUE_RE.match
+    pos = find(key)
+    while pos >= 0:
+        end = pos + len(key)
+        if pos == 0 or data[pos - 1] != 0x5C:  # backslash
+            value = match(data, end)
+            if value:
+                raw = value.group(1)
+                yield (json.loads(b'"' + raw + b'"') if b'\\' in raw
+                       else raw.decode('utf-8'))
+                end = value.end()
+        pos = find(key, end)
+
+
+def _scan_compile_commands(data):
+    """Yield (directory, file) pairs by scanning raw compile_commands.json
+
+    Only the "directory" and "file" values are decoded; the rest of each
+    entry (arguments, command, output) is skipped over without building any
+    objects. Both keys are mandatory in every entry of a compilation
+    database, so the n-th directory belongs to the n-th file whatever the
+    key order inside an entry.
+    """
+    return zip(_scan_values(data, b'"directory"'), _scan_values(data, b'"file"'))
+
+
+def _iter_compile_commands(compile_commands: Path):
+    """Yield (directory, file) for every entry of compile_commands.json
+
+    Databases up to _SCAN_THRESHOLD are read in one go and parsed from raw
+    bytes by _loads(). Above _STREAMING_THRESHOLD they are streamed with
+    ijson when it is installed; otherwise larger ones are scanned for just
+    the two fields, straight from a memory map above _MMAP_THRESHOLD.
+    Arguments and command strings are never materialized.
+    """
+    size = compile_commands.stat().st_size
+    if ijson is not None and size > _STREAMING_THRESHOLD:
+        with open(compile_commands, 'rb') as f:
+            directory = file = None
+            for prefix, event, value in ijson.parse(f):
+                if prefix == 'item.directory':
+                    directory = value
+                elif prefix == 'item.file':
+                    file = value
+                elif prefix == 'item' and event == 'end_map':
+                    if file is not None:
+                        yield directory or '.', file
+                    directory = file = None
+        return
+
+    if size > _MMAP_THRESHOLD:
+        # Pages are loaded on demand instead of copying the file into memory
+        with open(compile_commands, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _scan_compile_commands(data)
+        return
+
+    if size > _SCAN_THRESHOLD:
+        yield from _scan_compile_commands(compile_commands.read_bytes())
+        return
+
+    commands = _loads(compile_commands.read_bytes())
+    for cmd in commands:
+        if 'file' in cmd:
+            yield cmd.get('directory', '.'), cmd['file']
+
+
+# Per-user cache for results that are expensive to recompute between runs
+_TOOL_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME",
+                                      Path.home() / ".cache")) / "mcp-cpp"
+_CLANGD_OK_MARKER = _TOOL_CACHE_DIR / "clangd.ok"
+# Bumped whenever the layout of the cached compile_commands.json file list
+# changes; caches of another version are parsed again
+_CC_CACHE_VERSION = 1
+
+# Signals shutdown() escalates through, with the grace period after each;
+# SIGINT lets clangd flush its index shards so the next run stays
+# incremental. Without process groups (Windows) there is no SIGINT to send
+# and terminating clangd is already a hard stop
+if hasattr(os, "killpg"):
+    _STOP_SIGNALS = ((signal.SIGINT, 5), (signal.SIGTERM, 5), (signal.SIGKILL, None))
+    _KILL_SIGNAL = signal.SIGKILL
+else:
+    _STOP_SIGNALS = ((signal.SIGTERM, None),)
+    _KILL_SIGNAL = signal.SIGTERM
+
+
+def _clangd_fingerprint(clangd_path: str):
+    """Identify a clangd binary by resolved path, size and mtime"""
+    resolved = shutil.which(clangd_path)
+    if not resolved:
+        return None
+    resolved = os.path.realpath(resolved)
+    st = os.stat(resolved)
+    return f"{resolved}\t{st.st_size}\t{st.st_mtime_ns}"
+
+
+def verify_clangd(clangd_path: str) -> bool:
+    """Check that clangd runs, remembering success for the same binary
+
+    `clangd --version` is only executed when the binary changed since the
+    last successful probe (e.g. after an upgrade).
+    """
+    fingerprint = _clangd_fingerprint(clangd_path)
+    if fingerprint is None:
+        return False
+
+    try:
+        if _CLANGD_OK_MARKER.read_text(encoding='utf-8') == fingerprint:
+            return True
+    except OSError:
+        pass
+
+    try:
+        subprocess.run([clangd_path, "--version"],
+                       capture_output=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+    try:
+        _CLANGD_OK_MARKER.parent.mkdir(parents=True, exist_ok=True)
+        _CLANGD_OK_MARKER.write_text(fingerprint, encoding='utf-8')
+    except OSError:
+        pass  # Caching is best effort
+    return True
+
+
+def _parallel_rmtree(root: Path):
+    """Remove a directory tree, unlinking its files concurrently
+
+    clangd's index holds thousands of small shard files; unlinking them from
+    a thread pool overlaps the per-file syscalls. The emptied directory
+    skeleton is then removed by shutil.rmtree.
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+        # Symlinked directories are not descended into; unlink the link itself
+        files.extend(os.path.join(dirpath, name) for name in dirnames
+                     if os.path.islink(os.path.join(dirpath, name)))
+
+    if files:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Consume the results so the first failure is raised here
+            for _ in executor.map(os.unlink, files):
+                pass
+
+    shutil.rmtree(root)
+
+
+def _uri_basename(uri: str) -> str:
+    """Return the file name of a file:// URI, decoding percent-escapes"""
+    return unquote(urlparse(uri).path).rsplit('/', 1)[-1]
 
 
 class ClangdIndexGenerator:
+    # LSP header prefix, matched on raw bytes without a regex
+    _CONTENT_LENGTH = b"Content-Length: "
+    # Separator line used by the summary reports
+    _BAR = "=" * 40
+    # Issues summary; every section is pre-rendered with its own newlines
+    # (or left empty), so the report is formatted and written in one go
+    REPORT_TMPL = ("\n📊 INDEXING ISSUES SUMMARY\n{bar}\n"
+                   "{err_section}{diag_section}{warn_section}{lsp_section}"
+                   "{rate_section}{bar}\n")
+
     def __init__(self, build_directory: str, clangd_path: str = "clangd",
-                 refresh_index: bool = False, log_file: str = None, verbose: bool = False):
+                 refresh_index: bool = False, log_file: str = None, verbose: bool = False,
+                 jobs: int = 0, pch_storage: str = "memory",
+                 index_priority: str = "normal"):
         self.build_directory = Path(build_directory).resolve()
         self.clangd_path = clangd_path
+        self.jobs = jobs  # clangd worker threads, 0 keeps clangd's default
+        self.pch_storage = pch_storage
+        self.index_priority = index_priority
         self.refresh_index = refresh_index
         self.log_file = log_file
         self.verbose = verbose
@@ -41,18 +258,30 @@ class ClangdIndexGenerator:
         self.request_id = 0
         self.indexing_progress = {}
         self.indexed_files = set()  # All files indexed (including headers)
-        self.processed_compile_files = set()  # Files from compile_commands.json that have been processed
+        self.processed_compile_files = set()  # Resolved path strings from compile_commands.json that have been processed
         # Files from compile_commands.json for reporting (now stores full paths)
-        self.compile_commands_files = set()  # Set of Path objects
-        self.compile_commands_files_by_name = set()  # Set of filenames for backward compatibility
+        # Both are frozensets once load_compile_commands_info() has run
+        self.compile_commands_files = frozenset()  # Resolved path strings
+        self.compile_commands_files_by_name = frozenset()  # Filenames for backward compatibility
         self.failed_files = set()  # Files that failed to index
-        self.files_with_errors = {}  # filename -> error count
-        self.indexing_complete = False
+        self.files_with_errors = collections.Counter()  # filename -> error count
+        # asyncio.Event, created by start_clangd() on the running loop (before
+        # Python 3.10 an Event binds to the loop current at construction)
+        self.indexing_complete = None
+        self._stop_requested = False  # Set once SIGINT/SIGTERM was received
         self.last_indexing_activity = time.time()
         self.diagnostic_errors = 0  # Total count of diagnostic errors
         self.diagnostic_warnings = 0  # Total count of diagnostic warnings
         self.lsp_errors = 0  # Count of LSP protocol errors
         self.current_processing_file = ""  # Current file being processed for progress display
+        self.reader_task = None  # Task draining LSP messages from clangd stdout
+        self.stderr_task = None  # Task draining clangd logs from stderr
+        self.wait_task = None  # Task watching for indexing completion
+        self._pending = {}  # request id -> future resolved with the response
+        self.indexing_started = None  # time.time() when clangd was started
+        # Written once a run indexed every translation unit; the background
+        # index alone can be partial (interrupted runs keep their shards)
+        self.index_marker = self.build_directory / ".cache" / "clangd" / "generate-index.json"
 
         # Open log file if specified
         if self.log_file:
@@ -112,9 +341,10 @@ class ClangdIndexGenerator:
     def _mark_file_as_processed(self, file_path_str: str, activity: str = ""):
         """Mark a file as processed if it's in compile_commands.json"""
         try:
-            # Normalize the path from clangd to absolute path
-            resolved_path = Path(file_path_str).resolve()
-            filename = resolved_path.name
+            # Normalize the path from clangd to absolute path; plain strings
+            # keep the set lookups on the fast str hash
+            resolved_path = os.path.realpath(file_path_str)
+            filename = os.path.basename(resolved_path)
             
             # Check if this resolved path is in our compile_commands.json
             if resolved_path in self.compile_commands_files:
@@ -149,37 +379,52 @@ class ClangdIndexGenerator:
         else:
             print(progress_msg)
 
-    def clean_cache(self):
-        """Clean clangd cache directories to ensure fresh indexing (only if refresh_index is True)"""
-        if not self.refresh_index:
-            print("🔄 Skipping cache cleaning (use --refresh-index to clean cache)")
-            return
-
-        cache_locations = [
+    def _cache_locations(self):
+        """Yield each candidate clangd cache directory once"""
+        home = Path.home()
+        candidates = (
             # Common clangd cache locations
-            Path.home() / ".cache" / "clangd",
-            Path.home() / ".clangd",
+            home / ".cache" / "clangd",
+            home / ".clangd",
             self.build_directory / ".clangd",
             self.build_directory.parent / ".clangd",
             # Project-local cache directories
             self.build_directory.parent / ".cache" / "clangd",
             self.build_directory / ".cache" / "clangd",
-            # XDG cache directory
-            Path(os.environ.get("XDG_CACHE_HOME",
-                                Path.home() / ".cache")) / "clangd",
-        ]
+            # XDG cache directory (often the same as ~/.cache/clangd)
+            Path(os.environ.get("XDG_CACHE_HOME", home / ".cache")) / "clangd",
+        )
+
+        seen = set()
+        for candidate in candidates:
+            resolved = candidate.resolve(strict=False)
+            if resolved not in seen:
+                seen.add(resolved)
+                yield resolved
+
+    def clean_cache(self):
+        """Clean clangd cache directories to ensure fresh indexing (only if refresh_index is True)"""
+        if not self.refresh_index:
+            print("🔄 Skipping cache cleaning (use --refresh-index to clean cache)")
+            return
 
         print("🧹 Cleaning clangd cache directories...")
         cleaned_any = False
 
-        for cache_dir in cache_locations:
-            if cache_dir.exists() and cache_dir.is_dir():
-                try:
-                    print(f"   Removing: {cache_dir}")
-                    shutil.rmtree(cache_dir)
-                    cleaned_any = True
-                except Exception as e:
-                    print(f"   ⚠️  Could not remove {cache_dir}: {e}")
+        for cache_dir in self._cache_locations():
+            # One stat per location instead of exists() + is_dir()
+            try:
+                st = os.stat(cache_dir)
+            except FileNotFoundError:
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                continue
+            try:
+                print(f"   Removing: {cache_dir}")
+                _parallel_rmtree(cache_dir)
+                cleaned_any = True
+            except Exception as e:
+                print(f"   ⚠️  Could not remove {cache_dir}: {e}")
 
         if not cleaned_any:
             print("   No cache directories found to clean")
@@ -187,13 +432,68 @@ class ClangdIndexGenerator:
             print("✅ Cache cleaning completed")
         print()
 
-    def start_clangd(self):
+    def is_index_fresh(self) -> bool:
+        """Check whether the on-disk background index is newer than its inputs
+
+        The index is fresh when the completion marker of a previous run
+        covers as many translation units as compile_commands.json lists now,
+        .cache/clangd/index holds shards, and neither compile_commands.json
+        nor any source file listed in it was modified after that run started.
+        Headers are not checked.
+        """
+        index_dir = self.build_directory / ".cache" / "clangd" / "index"
+        compile_commands = self.build_directory / "compile_commands.json"
+        try:
+            marker = _loads(self.index_marker.read_bytes())
+            indexed_at = marker["indexed_at"]
+            if marker["translation_units"] != len(self.compile_commands_files):
+                return False
+            if compile_commands.stat().st_mtime >= indexed_at:
+                return False
+            with os.scandir(index_dir) as entries:
+                if next(entries, None) is None:
+                    return False
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return False
+
+        # Short-circuit on the first source edited after the last indexing
+        for file_path in self.compile_commands_files:
+            try:
+                if os.stat(file_path).st_mtime >= indexed_at:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _write_index_marker(self, translation_units: int):
+        """Record that this run indexed all translation units (see is_index_fresh)"""
+        try:
+            self.index_marker.parent.mkdir(parents=True, exist_ok=True)
+            self.index_marker.write_bytes(_dumps({
+                "indexed_at": self.indexing_started,
+                "translation_units": translation_units,
+            }))
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write {self.index_marker}: {e}")
+
+    async def start_clangd(self):
         """Start clangd with the same arguments VS Code uses"""
         compile_commands = self.build_directory / "compile_commands.json"
         if not compile_commands.exists():
             raise FileNotFoundError(
                 f"No compile_commands.json found in {self.build_directory}")
 
+        self.indexing_complete = asyncio.Event()
+
+        # Sources edited from here on are not known to be in the index. An
+        # earlier marker no longer holds once this run starts changing the
+        # index: if it gets interrupted, the next run must not skip
+        self.indexing_started = time.time()
+        try:
+            self.index_marker.unlink()
+        except FileNotFoundError:
+            pass
+
         # Use same arguments as VS Code (from the log analysis)
         args = [
             self.clangd_path,
@@ -202,193 +502,220 @@ class ClangdIndexGenerator:
             "--completion-style=detailed",
             "--log=verbose",  # To see indexing messages
             "--query-driver=**",  # Allow querying all drivers for cross-compilation
+            # Keep preambles in RAM instead of writing them to temp files
+            f"--pch-storage={self.pch_storage}",
             # Pass build directory to clangd
             f"--compile-commands-dir={self.build_directory}"
         ]
+        if self.jobs > 0:
+            args.append(f"-j={self.jobs}")
+        if self.index_priority != "low":
+            # Don't let the OS deprioritize background indexing threads
+            # ("low" is clangd's default; the flag needs clangd 13+)
+            args.append(f"--background-index-priority={self.index_priority}")
 
         print(f"Starting clangd with args: {' '.join(args)}")
         print(f"Working directory: {os.getcwd()}")
         print(f"Build directory: {self.build_directory}")
 
-        # Run clangd from current working directory, pass build dir as argument
-        self.process = subprocess.Popen(
-            args,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=0
+        # Run clangd from current working directory, pass build dir as argument.
+        # clangd gets its own session so a terminal Ctrl+C doesn't kill it
+        # mid-write; shutdown() stops it in an orderly way instead.
+        self.process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
         )
+        atexit.register(self._kill_process_group)
 
-        # Set up JSON-RPC communication using simple JSON over stdio
-        self.stdin_lock = threading.Lock()
-
-        # Start message reader thread
-        self.reader_thread = threading.Thread(
-            target=self._read_messages, daemon=True)
-        self.reader_thread.start()
+        # JSON-RPC over stdio; the event loop owns both ends of the pipe
+        self.reader = self.process.stdout
+        self.writer = self.process.stdin
 
-        # Start stderr reader for clangd logs
-        self.stderr_thread = threading.Thread(
-            target=self._read_stderr, daemon=True)
-        self.stderr_thread.start()
+        # Cooperative reader tasks for LSP messages and clangd logs
+        self.reader_task = asyncio.create_task(self._read_messages())
+        self.stderr_task = asyncio.create_task(self._read_stderr())
 
-    def _read_stderr(self):
+    async def _read_stderr(self):
         """Read stderr for clangd log messages including indexing progress"""
-        while self.process and self.process.poll() is None:
+        pending = b""
+        while True:
             try:
-                line = self.process.stderr.readline()
-                if not line:
+                # Drain everything clangd has logged so far in one wakeup
+                # instead of resuming the task once per line
+                chunk = await self.process.stderr.read(65536)
+                if not chunk:
                     break
-                line = line.strip()
-                if line:
-                    # Log all stderr to file if logging is enabled
-                    self._log_clangd_stderr(line)
-
-                    # Track indexing-related messages with reduced verbosity
-                    show_clangd_log = self.verbose and any(keyword in line for keyword in [
-                        "Enqueueing", "commands for indexing", "Indexed",
-                        "symbols", "backgroundIndexProgress",
-                        "Building first preamble", "compilation database",
-                        "Broadcasting", "ASTWorker", "Error", "Failed",
-                        "error:", "warning:", "fatal error"
-                    ])
-                    
-                    if show_clangd_log:
-                        self._print_verbose(f"[CLANGD LOG] {line}")
-
-                    # Track file processing from multiple log patterns
-                    file_processed = False
-                    
-                    if "Indexed " in line and "symbols" in line:
-                        # Extract filename from log line like:
-                        # "Indexed /path/to/file.cpp (1234 symbols, ...)"
-                        try:
-                            file_part = line.split("Indexed ")[1].split(" (")[0]
-                            filename = Path(file_part).name
-                            self.indexed_files.add(filename)
-                            
-                            # Mark as processed if it's from compile_commands.json
-                            if self._mark_file_as_processed(file_part, "indexed with symbols"):
-                                file_processed = True
-                                if self.verbose:
-                                    symbols_part = line.split("(")[1].split(" symbols")[0] if "(" in line else "unknown"
-                                    print(f"✅ Indexed {filename} ({symbols_part} symbols)")
-
-                        except Exception:
-                            pass  # Ignore parsing errors
-                    
-                    elif "Building first preamble for " in line:
-                        # Extract filename from preamble build message
-                        # Format: "Building first preamble for /path/to/file.cpp version N"
-                        try:
-                            after_for = line.split("Building first preamble for ")[1]
-                            file_part = after_for.split(" version ")[0].strip()
-                            if self._mark_file_as_processed(file_part, "building preamble"):
-                                file_processed = True
-                        except Exception:
-                            pass
-                    
-                    elif "ASTWorker building file " in line:
-                        # Extract filename from ASTWorker build messages
-                        # Format: "ASTWorker building file /path/to/file.cpp version N with command ..."
-                        try:
-                            after_file = line.split("ASTWorker building file ")[1]
-                            file_part = after_file.split(" version ")[0].strip()
-                            if self._mark_file_as_processed(file_part, "ASTWorker building"):
-                                file_processed = True
-                        except Exception:
-                            pass
-                    
-                    # Update progress display if a compile_commands.json file was processed
-                    if file_processed and not self.verbose:
-                        self._print_progress(update_in_place=True)
-
-                    # Track indexing failures
-                    elif any(error_indicator in line.lower() for error_indicator in [
-                        "error:", "fatal error", "failed to", "could not", "cannot"
-                    ]):
-                        # Extract potential filename from error messages
-                        try:
-                            # Look for patterns like "file.cpp:line:col: error"
-                            if ".cpp:" in line or ".cc:" in line or ".cxx:" in line:
-                                for ext in [".cpp:", ".cc:", ".cxx:"]:
-                                    if ext in line:
-                                        file_part = line.split(ext)[0]
-                                        filename_with_ext = file_part.split("/")[-1] + ext[:-1]
-                                        if filename_with_ext in self.compile_commands_files_by_name:
-                                            if filename_with_ext not in self.files_with_errors:
-                                                self.files_with_errors[filename_with_ext] = 0
-                                            self.files_with_errors[filename_with_ext] += 1
-                                            error_msg = line.split('error:')[-1].strip()
-                                            self._print_verbose(f"❌ Error in {filename_with_ext}: {error_msg}")
-                                        break
-                            else:
-                                self._print_verbose(f"❌ General indexing error: {line}")
-                        except Exception:
-                            self._print_verbose(f"❌ Parse error in log: {line}")
-
-                    # Also track from symbol slab messages
-                    elif "symbol slab:" in line and "symbols" in line:
-                        # These indicate files being processed
-                        symbols_count = line.split("symbol slab:")[1].split("symbols")[0].strip()
-                        if symbols_count.isdigit() and int(symbols_count) > 0:
-                            self._print_verbose(f"📊 Processing symbols: {symbols_count} symbols indexed")
-                            self.last_indexing_activity = time.time()
-
-                    # Check for indexing completion signals
-                    elif "backgroundIndexProgress" in line and "end" in line:
-                        self._print_verbose("🎯 Background indexing progress ended")
-                        self.indexing_complete = True
-
-                    elif "ASTWorker" in line and ("idle" in line.lower() or "finished" in line.lower()):
-                        self._print_verbose("🔄 ASTWorker activity completed")
+                *lines, pending = (pending + chunk).split(b"\n")
+                for raw_line in lines:
+                    line = raw_line.decode('utf-8', errors='replace').strip()
+                    if line:
+                        self._handle_stderr_line(line)
 
             except Exception as e:
                 print(f"Error reading stderr: {e}")
                 break
 
-    def _read_messages(self):
+    def _handle_stderr_line(self, line: str):
+        """Track indexing progress from a single clangd log line"""
+        # Log all stderr to file if logging is enabled
+        self._log_clangd_stderr(line)
+
+        # Track indexing-related messages with reduced verbosity
+        show_clangd_log = self.verbose and any(keyword in line for keyword in [
+            "Enqueueing", "commands for indexing", "Indexed",
+            "symbols", "backgroundIndexProgress",
+            "Building first preamble", "compilation database",
+            "Broadcasting", "ASTWorker", "Error", "Failed",
+            "error:", "warning:", "fatal error"
+        ])
+        
+        if show_clangd_log:
+            self._print_verbose(f"[CLANGD LOG] {line}")
+
+        # Track file processing from multiple log patterns
+        file_processed = False
+        
+        if "Indexed " in line and "symbols" in line:
+            # Extract filename from log line like:
+            # "Indexed /path/to/file.cpp (1234 symbols, ...)"
+            try:
+                file_part = line.split("Indexed ")[1].split(" (")[0]
+                filename = os.path.basename(file_part)
+                self.indexed_files.add(filename)
+                
+                # Mark as processed if it's from compile_commands.json
+                if self._mark_file_as_processed(file_part, "indexed with symbols"):
+                    file_processed = True
+                    if self.verbose:
+                        symbols_part = line.split("(")[1].split(" symbols")[0] if "(" in line else "unknown"
+                        print(f"✅ Indexed {filename} ({symbols_part} symbols)")
+
+            except Exception:
+                pass  # Ignore parsing errors
+        
+        elif "Building first preamble for " in line:
+            # Extract filename from preamble build message
+            # Format: "Building first preamble for /path/to/file.cpp version N"
+            try:
+                after_for = line.split("Building first preamble for ")[1]
+                file_part = after_for.split(" version ")[0].strip()
+                if self._mark_file_as_processed(file_part, "building preamble"):
+                    file_processed = True
+            except Exception:
+                pass
+        
+        elif "ASTWorker building file " in line:
+            # Extract filename from ASTWorker build messages
+            # Format: "ASTWorker building file /path/to/file.cpp version N with command ..."
+            try:
+                after_file = line.split("ASTWorker building file ")[1]
+                file_part = after_file.split(" version ")[0].strip()
+                if self._mark_file_as_processed(file_part, "ASTWorker building"):
+                    file_processed = True
+            except Exception:
+                pass
+        
+        # Update progress display if a compile_commands.json file was processed
+        if file_processed and not self.verbose:
+            self._print_progress(update_in_place=True)
+
+        # Track indexing failures
+        elif any(error_indicator in line.lower() for error_indicator in [
+            "error:", "fatal error", "failed to", "could not", "cannot"
+        ]):
+            # Extract potential filename from error messages
+            try:
+                # Look for patterns like "file.cpp:line:col: error"
+                if ".cpp:" in line or ".cc:" in line or ".cxx:" in line:
+                    for ext in [".cpp:", ".cc:", ".cxx:"]:
+                        if ext in line:
+                            file_part = line.split(ext)[0]
+                            filename_with_ext = file_part.split("/")[-1] + ext[:-1]
+                            if filename_with_ext in self.compile_commands_files_by_name:
+                                self.files_with_errors[filename_with_ext] += 1
+                                error_msg = line.split('error:')[-1].strip()
+                                self._print_verbose(f"❌ Error in {filename_with_ext}: {error_msg}")
+                            break
+                else:
+                    self._print_verbose(f"❌ General indexing error: {line}")
+            except Exception:
+                self._print_verbose(f"❌ Parse error in log: {line}")
+
+        # Also track from symbol slab messages
+        elif "symbol slab:" in line and "symbols" in line:
+            # These indicate files being processed
+            symbols_count = line.split("symbol slab:")[1].split("symbols")[0].strip()
+            if symbols_count.isdigit() and int(symbols_count) > 0:
+                self._print_verbose(f"📊 Processing symbols: {symbols_count} symbols indexed")
+                self.last_indexing_activity = time.time()
+
+        # Check for indexing completion signals
+        elif "backgroundIndexProgress" in line and "end" in line:
+            self._print_verbose("🎯 Background indexing progress ended")
+            self.indexing_complete.set()
+
+        elif "ASTWorker" in line and ("idle" in line.lower() or "finished" in line.lower()):
+            self._print_verbose("🔄 ASTWorker activity completed")
+
+    async def _read_messages(self):
         """Read JSON-RPC messages from clangd using LSP protocol"""
-        while self.process and self.process.poll() is None:
+        # Read whatever is available in large chunks and split out every
+        # complete frame, instead of one header readline/body read per message
+        buffer = bytearray()
+        prefix = self._CONTENT_LENGTH
+        while True:
             try:
-                # Read the Content-Length header
-                while True:
-                    line = self.process.stdout.readline()
-                    if not line:
-                        return
-                    line = line.strip()
-                    if line.startswith('Content-Length:'):
-                        content_length = int(line.split(':')[1].strip())
-                        break
-                    elif line == '':
-                        # Empty line after headers
-                        break
+                chunk = await self.reader.read(65536)
+                if not chunk:
+                    # clangd closed its stdout
+                    break
+                buffer += chunk
 
-                # Read any remaining header lines until empty line
+                pos = 0
                 while True:
-                    line = self.process.stdout.readline()
-                    if not line:
-                        return
-                    line = line.strip()
-                    if line == '':
+                    # Header block ends with an empty separator line
+                    header_end = buffer.find(b"\r\n\r\n", pos)
+                    if header_end < 0:
                         break
 
-                # Read the JSON content
-                if 'content_length' in locals():
-                    json_data = self.process.stdout.read(content_length)
-                    if json_data:
-                        try:
-                            message = json.loads(json_data)
-                            self._handle_message(message)
-                        except json.JSONDecodeError as e:
-                            print(f"JSON decode error: {e}")
-                            print(f"Raw data: {json_data}")
+                    content_length = None
+                    for line in buffer[pos:header_end].split(b"\r\n"):
+                        if line.startswith(prefix):
+                            content_length = int(line[len(prefix):])
+
+                    body_start = header_end + 4
+                    if content_length is None:
+                        pos = body_start
+                        continue
+                    body_end = body_start + content_length
+                    if len(buffer) < body_end:
+                        break  # Wait for the rest of the body
+
+                    # Decode the JSON content
+                    json_data = bytes(buffer[body_start:body_end])
+                    pos = body_end
+                    try:
+                        message = _loads(json_data)
+                        self._handle_message(message)
+                    except json.JSONDecodeError as e:
+                        print(f"JSON decode error: {e}")
+                        print(f"Raw data: {json_data}")
+
+                # Drop consumed frames once per chunk
+                del buffer[:pos]
 
             except Exception as e:
                 print(f"Error reading message: {e}")
                 break
 
+        # No more responses can arrive; release anyone still waiting
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("clangd closed the connection"))
+
     def _handle_message(self, message: Dict[str, Any]):
         """Handle incoming messages from clangd"""
         # Log incoming message if logging is enabled
@@ -396,6 +723,12 @@ class ClangdIndexGenerator:
 
         method = message.get("method", "")
 
+        # Wake up whoever is waiting for the response to this request
+        if not method:
+            future = self._pending.pop(message.get("id"), None)
+            if future and not future.done():
+                future.set_result(message)
+
         # Debug: print all methods we receive in verbose mode
         if method:
             self._print_verbose(f"🔍 Received method: {method}")
@@ -430,14 +763,14 @@ class ClangdIndexGenerator:
                     if not self.verbose:
                         print()  # New line to finish the progress indicator
                     print("✅ Background indexing completed!")
-                    self.indexing_complete = True
+                    self.indexing_complete.set()
 
         elif method == "textDocument/clangd.fileStatus":
             # File status updates
             params = message.get("params", {})
             uri = params.get("uri", "")
             state = params.get("state", "")
-            filename = Path(uri.replace("file://", "")).name
+            filename = _uri_basename(uri)
             self._print_verbose(f"📄 File status: {filename} - {state}")
 
         elif method == "textDocument/publishDiagnostics":
@@ -445,24 +778,23 @@ class ClangdIndexGenerator:
             params = message.get("params", {})
             uri = params.get("uri", "")
             diagnostics = params.get("diagnostics", [])
-            filename = Path(uri.replace("file://", "")).name
+            filename = _uri_basename(uri)
 
             if diagnostics:
                 # Track errors and warnings separately
-                errors = [d for d in diagnostics if d.get('severity') == 1]
-                warnings = [d for d in diagnostics if d.get('severity') == 2]
+                severities = collections.Counter(d.get('severity') for d in diagnostics)
+                errors = severities[1]
+                warnings = severities[2]
 
                 # Track diagnostics for failure reporting
                 if filename in self.compile_commands_files_by_name:
                     if errors:
-                        self.diagnostic_errors += len(errors)
-                        if filename not in self.files_with_errors:
-                            self.files_with_errors[filename] = 0
-                        self.files_with_errors[filename] += len(errors)
-                        self._print_verbose(f"❌ {filename}: {len(errors)} error(s)")
+                        self.diagnostic_errors += errors
+                        self.files_with_errors[filename] += errors
+                        self._print_verbose(f"❌ {filename}: {errors} error(s)")
                     if warnings:
-                        self.diagnostic_warnings += len(warnings)
-                        self._print_verbose(f"⚠️  {filename}: {len(warnings)} warning(s)")
+                        self.diagnostic_warnings += warnings
+                        self._print_verbose(f"⚠️  {filename}: {warnings} warning(s)")
                 else:
                     self._print_verbose(f"🔍 Diagnostics for {filename}: {len(diagnostics)} issues")
             # Don't print "Unknown method" for this standard LSP method
@@ -497,15 +829,15 @@ class ClangdIndexGenerator:
         # Log outgoing message if logging is enabled
         self._log_lsp_message(message, "OUTGOING")
 
-        json_text = json.dumps(message)
-        content = f"Content-Length: {len(json_text)}\r\n\r\n{json_text}"
+        body = _dumps(message)
+        header = f"Content-Length: {len(body)}\r\n\r\n".encode('ascii')
 
-        with self.stdin_lock:
-            try:
-                self.process.stdin.write(content)
-                self.process.stdin.flush()
-            except Exception as e:
-                print(f"Error writing to clangd: {e}")
+        # StreamWriter.write() only buffers; the event loop flushes the pipe,
+        # so no lock is needed around concurrent senders
+        try:
+            self.writer.write(header + body)
+        except Exception as e:
+            print(f"Error writing to clangd: {e}")
 
     def _send_response(self, request_id: Any, result: Any):
         """Send a response to clangd"""
@@ -526,9 +858,22 @@ class ClangdIndexGenerator:
             "params": params or {}
         }
         self._print_verbose(f"📤 Sending {method} request (id: {self.request_id})")
+        self._pending[self.request_id] = asyncio.get_running_loop().create_future()
         self._send_json_rpc(request)
         return self.request_id
 
+    async def _wait_for_response(self, request_id: int, timeout: float):
+        """Wait for the response to a request, None on timeout or disconnect"""
+        future = self._pending.get(request_id)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
     def _send_notification(self, method: str, params: Any = None):
         """Send a notification to clangd"""
         notification = {
@@ -539,7 +884,7 @@ class ClangdIndexGenerator:
         self._print_verbose(f"📤 Sending {method} notification")
         self._send_json_rpc(notification)
 
-    def initialize_lsp(self):
+    async def initialize_lsp(self):
         """Initialize clangd with comprehensive capabilities for AI agent use"""
         # Comprehensive capabilities for AI agents that work like humans
         init_params = {
@@ -696,14 +1041,14 @@ class ClangdIndexGenerator:
         }
 
         print("🔧 Initializing LSP with comprehensive AI capabilities...")
-        self._send_request("initialize", init_params)
-        time.sleep(1)  # Wait for initialize response
+        request_id = self._send_request("initialize", init_params)
+        if await self._wait_for_response(request_id, timeout=30) is None:
+            print("⚠️  No initialize response from clangd, continuing anyway")
 
         print("✅ Sending initialized notification...")
         self._send_notification("initialized")
-        time.sleep(0.5)
 
-    def trigger_indexing_by_opening_file(self):
+    async def trigger_indexing_by_opening_file(self):
         """
         The key insight: VS Code triggers indexing by opening a file!
         This is what actually starts the background indexing process.
@@ -712,17 +1057,16 @@ class ClangdIndexGenerator:
         compile_commands = self.build_directory / "compile_commands.json"
 
         try:
-            with open(compile_commands, 'r') as f:
-                commands = json.load(f)
+            first_command = next(_iter_compile_commands(compile_commands), None)
 
-            if not commands:
+            if first_command is None:
                 print("⚠️  No files in compile_commands.json. Cannot trigger indexing.")
                 return
 
             # Use the first file from compile_commands.json and resolve it properly
-            cmd = commands[0]
-            directory = Path(cmd.get('directory', '.')).resolve()
-            cpp_file = Path(cmd['file'])
+            directory_str, file_str = first_command
+            directory = Path(directory_str).resolve()
+            cpp_file = Path(file_str)
             if not cpp_file.is_absolute():
                 cpp_file = (directory / cpp_file).resolve()
             else:
@@ -755,9 +1099,8 @@ class ClangdIndexGenerator:
         print("🚀 Sending textDocument/didOpen - this should trigger indexing!")
         self._send_notification("textDocument/didOpen", did_open_params)
 
-        # Also send some requests that VS Code typically sends
-        time.sleep(0.1)
-
+        # Also send some requests that VS Code typically sends; clangd handles
+        # messages in order, so no delay is needed after didOpen
         doc_uri = {"uri": f"file://{cpp_file}"}
 
         # Request document symbols (this works with clangd)
@@ -766,7 +1109,7 @@ class ClangdIndexGenerator:
 
         # Note: Don't request foldingRange as clangd doesn't support it
 
-    def open_file_for_indexing(self, file_path: Path):
+    def open_file_for_indexing(self, file_path: str):
         """Open a specific file to trigger its indexing"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -785,11 +1128,11 @@ class ClangdIndexGenerator:
             }
         }
 
-        self._print_verbose(f"📂 Opening file to trigger indexing: {file_path.name}")
+        self._print_verbose(f"📂 Opening file to trigger indexing: {os.path.basename(file_path)}")
         self._send_notification("textDocument/didOpen", did_open_params)
         return True
 
-    def ensure_all_files_indexed(self):
+    async def ensure_all_files_indexed(self):
         """Open files from compile_commands.json one at a time to ensure complete indexing"""
         if not self.compile_commands_files:
             return True
@@ -814,19 +1157,20 @@ class ClangdIndexGenerator:
         
         for file_path in sorted(unprocessed_files):
             files_opened += 1
+            filename = os.path.basename(file_path)
             progress = f"({files_opened}/{len(unprocessed_files)})"
             
             if self.verbose:
-                print(f"   {progress} Opening {file_path.name} and waiting for processing...")
+                print(f"   {progress} Opening {filename} and waiting for processing...")
             else:
-                print(f"   {progress} Opening {file_path.name}...", end='', flush=True)
+                print(f"   {progress} Opening {filename}...", end='', flush=True)
             
             # Open the file
             if not self.open_file_for_indexing(file_path):
                 if not self.verbose:
                     print(" ❌ Failed to open")
                 else:
-                    print(f"   ❌ Failed to open {file_path.name}")
+                    print(f"   ❌ Failed to open {filename}")
                 continue
             
             # Wait for this specific file to be processed
@@ -834,7 +1178,7 @@ class ClangdIndexGenerator:
             file_processed = False
             
             while time.time() - wait_start < max_wait_per_file:
-                time.sleep(0.3)
+                await asyncio.sleep(0.3)
                 
                 # Check if this file has been processed
                 if file_path in self.processed_compile_files:
@@ -842,7 +1186,7 @@ class ClangdIndexGenerator:
                     if not self.verbose:
                         print(" ✅")
                     else:
-                        print(f"   ✅ {file_path.name} processed successfully")
+                        print(f"   ✅ {filename} processed successfully")
                     break
                 
                 # Check for ongoing activity - extend timeout if there's activity
@@ -856,7 +1200,7 @@ class ClangdIndexGenerator:
                 if not self.verbose:
                     print(" ⏰ timeout")
                 else:
-                    print(f"   ⏰ Timeout waiting for {file_path.name} to be processed")
+                    print(f"   ⏰ Timeout waiting for {filename} to be processed")
         
         # Final status check
         final_processed = len(self.processed_compile_files)
@@ -872,62 +1216,65 @@ class ClangdIndexGenerator:
             unprocessed = []
             for file_path in self.compile_commands_files:
                 if file_path not in self.processed_compile_files:
-                    unprocessed.append(file_path.name)
+                    unprocessed.append(os.path.basename(file_path))
             
             if self.verbose or len(unprocessed) <= 10:
-                for filename in sorted(unprocessed):
-                    print(f"   - {filename}")
+                print("\n".join(f"   - {filename}" for filename in sorted(unprocessed)))
             else:
-                for filename in sorted(unprocessed[:5]):
-                    print(f"   - {filename}")
+                print("\n".join(f"   - {filename}" for filename in sorted(unprocessed[:5])))
                 print(f"   ... and {len(unprocessed) - 5} more (use --verbose for full list)")
             
             return False
 
-    def wait_for_indexing_completion(self):
-        """Wait for clangd to finish indexing (no timeout)"""
-        print("👀 Waiting for indexing to complete...")
-        print("   Use Ctrl+C to interrupt if needed")
-        print()
-
-        # Wait for completion signals or process end
+    async def _wait_complete(self):
+        """Wait for completion signals, fallback conditions or process end"""
         start_time = time.time()
-        last_progress_time = time.time()
-
-        while self.process and self.process.poll() is None:
-            time.sleep(1)
-            current_time = time.time()
 
+        while self.process.returncode is None:
             # Primary completion signal: LSP progress "end"
-            if self.indexing_complete:
+            try:
+                await asyncio.wait_for(self.indexing_complete.wait(), timeout=1)
                 print("🎯 Primary signal: LSP progress indicates indexing complete")
                 # Give a bit more time for final file indexing messages
-                time.sleep(2)
-                break
+                await asyncio.sleep(2)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+            current_time = time.time()
 
             # Fallback 1: No indexing activity for extended period
             if (self.indexed_files and
                     current_time - self.last_indexing_activity > 45):
                 print("🔄 No indexing activity for 45 seconds, assuming completion")
-                break
+                return
 
             # Fallback 2: Reasonable time limit (10 minutes max)
             if current_time - start_time > 600:
                 print("⏰ Maximum indexing time reached (10 minutes), stopping")
-                break
+                return
+
+    async def wait_for_indexing_completion(self):
+        """Wait for clangd to finish indexing (no timeout)"""
+        print("👀 Waiting for indexing to complete...")
+        print("   Use Ctrl+C to interrupt if needed")
+        print()
+
+        self.wait_task = asyncio.create_task(self._wait_complete())
+        await self.wait_task
 
         # Clear any in-place progress display before final messages
         if not self.verbose:
             print()  # Ensure clean line after progress updates
         
         # Determine completion status
-        if self.indexing_complete:
+        if self.indexing_complete.is_set():
             print("✅ Initial indexing completed successfully!")
             # Now check coverage and ensure all files are indexed
             print("\n🔍 Checking compile commands coverage...")
-            if not self.ensure_all_files_indexed():
+            if not await self.ensure_all_files_indexed():
                 print("⚠️  Not all files could be indexed completely")
-        elif self.process and self.process.poll() is not None:
+        elif self.process and self.process.returncode is not None:
             print("⚠️  clangd process ended")
         else:
             print("🔄 Indexing monitoring stopped")
@@ -940,25 +1287,25 @@ class ClangdIndexGenerator:
                                 total_compile) * 100 if total_compile > 0 else 0
             
             print(f"\n📊 FINAL SUMMARY")
-            print("=" * 40)
+            print(self._BAR)
             print(f"📋 Files in compile_commands.json: {total_compile}")
             print(f"✅ Files processed by clangd: {processed_from_compile}")
             print(f"📊 Coverage: {final_percentage:.1f}%")
+            if processed_from_compile >= total_compile:
+                self._write_index_marker(total_compile)
 
             # Show which files were/weren't processed only in verbose mode or if there are missing files
             if processed_from_compile < total_compile:
                 missing_files = set()
                 for file_path in self.compile_commands_files:
                     if file_path not in self.processed_compile_files:
-                        missing_files.add(file_path.name)
+                        missing_files.add(os.path.basename(file_path))
                 
                 print(f"❓ Files not processed: {len(missing_files)}")
                 if self.verbose or len(missing_files) <= 5:
-                    for filename in sorted(missing_files):
-                        print(f"   - {filename}")
+                    print("\n".join(f"   - {filename}" for filename in sorted(missing_files)))
                 elif len(missing_files) > 5:
-                    for filename in sorted(list(missing_files)[:3]):
-                        print(f"   - {filename}")
+                    print("\n".join(f"   - {filename}" for filename in sorted(list(missing_files)[:3])))
                     print(f"   ... and {len(missing_files) - 3} more (use --verbose to see all)")
 
             # Also show total indexed files (including headers) in verbose mode
@@ -983,67 +1330,91 @@ class ClangdIndexGenerator:
                      self.diagnostic_warnings > 0 or self.lsp_errors > 0)
         
         if has_issues or self.verbose:
-            print("\n📊 INDEXING ISSUES SUMMARY")
-            print("=" * 40)
-
             if self.files_with_errors:
-                print(f"❌ Files with errors: {len(self.files_with_errors)}")
-                if self.verbose:
-                    for filename, error_count in sorted(self.files_with_errors.items()):
-                        print(f"   • {filename}: {error_count} error(s)")
-                elif len(self.files_with_errors) <= 3:
-                    for filename, error_count in sorted(self.files_with_errors.items()):
-                        print(f"   • {filename}: {error_count} error(s)")
+                if self.verbose or len(self.files_with_errors) <= 3:
+                    error_items = sorted(self.files_with_errors.items())
                 else:
                     # Show first 3 files with errors
-                    for filename, error_count in sorted(list(self.files_with_errors.items())[:3]):
-                        print(f"   • {filename}: {error_count} error(s)")
-                    print(f"   ... and {len(self.files_with_errors) - 3} more (use --verbose for details)")
+                    error_items = sorted(list(self.files_with_errors.items())[:3])
+                err_section = f"❌ Files with errors: {len(self.files_with_errors)}\n" + "".join(
+                    f"   • {filename}: {error_count} error(s)\n"
+                    for filename, error_count in error_items)
+                if len(error_items) < len(self.files_with_errors):
+                    err_section += f"   ... and {len(self.files_with_errors) - 3} more (use --verbose for details)\n"
             else:
-                print("✅ No files with compile errors detected")
+                err_section = "✅ No files with compile errors detected\n"
 
             if self.diagnostic_errors > 0:
-                print(f"❌ Total diagnostic errors: {self.diagnostic_errors}")
-            elif self.verbose:
-                print("✅ No diagnostic errors reported")
+                diag_section = f"❌ Total diagnostic errors: {self.diagnostic_errors}\n"
+            else:
+                diag_section = "✅ No diagnostic errors reported\n" if self.verbose else ""
 
             if self.diagnostic_warnings > 0:
-                print(f"⚠️  Total diagnostic warnings: {self.diagnostic_warnings}")
-            elif self.verbose:
-                print("✅ No diagnostic warnings reported")
+                warn_section = f"⚠️  Total diagnostic warnings: {self.diagnostic_warnings}\n"
+            else:
+                warn_section = "✅ No diagnostic warnings reported\n" if self.verbose else ""
 
             if self.lsp_errors > 0:
-                print(f"❌ LSP protocol errors: {self.lsp_errors}")
-            elif self.verbose:
-                print("✅ No LSP protocol errors")
-
-            # Calculate success rate
-            failed_files = set(self.files_with_errors.keys())
-            successful_files = self.indexed_files - failed_files
-
-            if self.compile_commands_files and self.verbose:
-                success_rate = (len(successful_files & self.compile_commands_files_by_name) /
-                                len(self.compile_commands_files)) * 100
-                print(f"\n🎯 Overall success rate: {success_rate:.1f}% "
-                      f"({len(successful_files & self.compile_commands_files_by_name)}/"
-                      f"{len(self.compile_commands_files)} files)")
+                lsp_section = f"❌ LSP protocol errors: {self.lsp_errors}\n"
+            else:
+                lsp_section = "✅ No LSP protocol errors\n" if self.verbose else ""
 
-            print("=" * 40)
+            # Calculate success rate (computed once, only when it is shown)
+            rate_section = ""
+            total_compile = len(self.compile_commands_files)
+            if total_compile and self.verbose:
+                successful_count = len(
+                    self.compile_commands_files_by_name & self.indexed_files
+                    - self.files_with_errors.keys())
+                success_rate = successful_count / total_compile * 100
+                rate_section = (f"\n🎯 Overall success rate: {success_rate:.1f}% "
+                                f"({successful_count}/{total_compile} files)\n")
+
+            self._write_report(self.REPORT_TMPL.format_map({
+                "bar": self._BAR,
+                "err_section": err_section,
+                "diag_section": diag_section,
+                "warn_section": warn_section,
+                "lsp_section": lsp_section,
+                "rate_section": rate_section,
+            }))
+
+    @staticmethod
+    def _write_report(text: str):
+        """Write a rendered report to stdout as one pre-encoded block"""
+        # Flush pending print() output first to keep the ordering intact
+        sys.stdout.flush()
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is None:
+            sys.stdout.write(text)
+            return
+        buffer.write(text.encode(sys.stdout.encoding or "utf-8", errors="replace"))
+        buffer.flush()
 
-    def shutdown(self):
+    async def shutdown(self):
         """Shutdown clangd gracefully"""
-        if self.writer:
+        if self.writer and self.process.returncode is None:
             print("🛑 Shutting down clangd...")
-            self._send_request("shutdown")
-            time.sleep(1)
+            request_id = self._send_request("shutdown")
+            # Proceeds as soon as the reply arrives
+            await self._wait_for_response(request_id, timeout=2)
             self._send_notification("exit")
 
-        if self.process:
-            self.process.terminate()
+        # Escalate SIGINT -> SIGTERM -> SIGKILL (see _STOP_SIGNALS)
+        for sig, grace in _STOP_SIGNALS:
+            if not self.process or self.process.returncode is not None:
+                break
+            if not self._signal_process_group(sig):
+                break
             try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.process.kill()
+                await asyncio.wait_for(self.process.wait(), timeout=grace)
+            except asyncio.TimeoutError:
+                print(f"⚠️  clangd did not exit after {sig.name}, escalating")
+
+        # Stop the reader tasks now that the pipes are closed
+        for task in (self.reader_task, self.stderr_task, self.wait_task):
+            if task and not task.done():
+                task.cancel()
 
         # Close log file if it was opened
         if self.log_file_handle:
@@ -1053,6 +1424,75 @@ class ClangdIndexGenerator:
             except Exception as e:
                 print(f"⚠️  Warning: Error closing log file: {e}")
 
+    def _signal_process_group(self, sig: signal.Signals) -> bool:
+        """Send a signal to clangd's process group, False if it is gone
+
+        Without process groups (Windows) clangd itself is terminated for
+        SIGTERM and killed otherwise.
+        """
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(os.getpgid(self.process.pid), sig)
+            elif sig == signal.SIGTERM:
+                self.process.terminate()
+            else:
+                self.process.kill()
+            return True
+        except ProcessLookupError:
+            return False
+
+    def _kill_process_group(self):
+        """atexit safety net: never leave clangd running detached"""
+        if self.process and self.process.returncode is None:
+            self._signal_process_group(_KILL_SIGNAL)
+
+    def _resolve_compile_commands(self, compile_commands: Path):
+        """Return the unique resolved source paths listed in compile_commands.json
+
+        The result is cached as JSON in the tool cache directory (one file
+        per database) together with a format version and the database's
+        mtime and size, so an unchanged database is not parsed again on the
+        next run.
+        """
+        database_path = str(compile_commands.resolve())
+        st = compile_commands.stat()
+        key = [_CC_CACHE_VERSION, database_path, st.st_mtime_ns, st.st_size]
+        digest = hashlib.blake2b(database_path.encode('utf-8'), digest_size=8).hexdigest()
+        cache_file = _TOOL_CACHE_DIR / f"cc-{digest}.json"
+
+        try:
+            cached = _loads(cache_file.read_bytes())
+            if cached["key"] == key:
+                return cached["files"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._print_verbose(f"⚠️  Ignoring unreadable cache {cache_file}: {e}")
+
+        # Track seen files to avoid duplicates - use the first occurrence
+        seen_files = set()
+        resolved_files = []
+
+        # Work on plain strings throughout
+        join, realpath = os.path.join, os.path.realpath
+
+        for directory_str, file_str in _iter_compile_commands(compile_commands):
+            # Resolve relative paths using the directory field
+            # (join() keeps file_str as-is when it is already absolute)
+            file_path = realpath(join(directory_str, file_str))
+
+            # Only add if we haven't seen this absolute path before (first occurrence wins)
+            if file_path not in seen_files:
+                seen_files.add(file_path)
+                resolved_files.append(file_path)
+
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_bytes(_dumps({"key": key, "files": resolved_files}))
+        except OSError:
+            pass  # Caching is best effort
+        return resolved_files
+
     def load_compile_commands_info(self):
         """Load files from compile_commands.json for information and reporting"""
         compile_commands = self.build_directory / "compile_commands.json"
@@ -1061,33 +1501,22 @@ class ClangdIndexGenerator:
                 f"No compile_commands.json found in {self.build_directory}")
 
         try:
-            with open(compile_commands, 'r') as f:
-                commands = json.load(f)
-
-            # Track seen files to avoid duplicates - use the first occurrence
-            seen_files = set()
             missing_files = []
-            
-            for cmd in commands:
-                if 'file' in cmd:
-                    # Resolve relative paths using the directory field
-                    directory = Path(cmd.get('directory', '.')).resolve()
-                    file_path = Path(cmd['file'])
-                    if not file_path.is_absolute():
-                        file_path = (directory / file_path).resolve()
-                    else:
-                        file_path = file_path.resolve()
-                    
-                    # Only add if we haven't seen this absolute path before (first occurrence wins)
-                    if file_path not in seen_files:
-                        seen_files.add(file_path)
-                        
-                        # Check if file exists
-                        if file_path.exists():
-                            self.compile_commands_files.add(file_path)  # Store resolved absolute Path object
-                            self.compile_commands_files_by_name.add(file_path.name)  # Store filename for backward compatibility
-                        else:
-                            missing_files.append(file_path)
+            existing_files = []
+
+            # Existence is checked on every run; only parsing is cached
+            exists = os.path.exists
+            for file_path in self._resolve_compile_commands(compile_commands):
+                if exists(file_path):
+                    existing_files.append(file_path)
+                else:
+                    missing_files.append(file_path)
+
+            # Store resolved absolute path strings, plus filenames for
+            # backward compatibility
+            basename = os.path.basename
+            self.compile_commands_files = frozenset(existing_files)
+            self.compile_commands_files_by_name = frozenset(map(basename, existing_files))
 
             total_files = len(self.compile_commands_files)
             print(f"📋 Found {total_files} files in compile_commands.json")
@@ -1100,11 +1529,9 @@ class ClangdIndexGenerator:
             if missing_files:
                 print(f"⚠️  Warning: {len(missing_files)} files from compile_commands.json do not exist:")
                 if self.verbose or len(missing_files) <= 5:
-                    for missing_file in missing_files:
-                        print(f"   - {missing_file}")
+                    print("\n".join(f"   - {missing_file}" for missing_file in missing_files))
                 else:
-                    for missing_file in missing_files[:3]:
-                        print(f"   - {missing_file}")
+                    print("\n".join(f"   - {missing_file}" for missing_file in missing_files[:3]))
                     print(f"   ... and {len(missing_files) - 3} more (use --verbose for full list)")
 
         except Exception as e:
@@ -1112,6 +1539,55 @@ class ClangdIndexGenerator:
             raise
 
 
+async def run(generator: ClangdIndexGenerator):
+    """Drive the whole indexing session on the running event loop"""
+    # SIGINT and SIGTERM both cancel the session once, which funnels into
+    # the single graceful shutdown() below; repeats are ignored so they
+    # cannot interrupt the shutdown itself
+    loop = asyncio.get_running_loop()
+    session = asyncio.current_task()
+
+    def request_stop():
+        if not generator._stop_requested:
+            generator._stop_requested = True
+            session.cancel()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, request_stop)
+        except NotImplementedError:
+            # Windows event loops have no signal handlers: Ctrl+C still
+            # arrives as KeyboardInterrupt (or a cancelled session)
+            break
+
+    try:
+        print("=" * 60)
+        print("🎯 clangd Index Generator")
+        print("=" * 60)
+
+        generator.load_compile_commands_info()  # Load files for information
+        if not generator.refresh_index and generator.is_index_fresh():
+            print("✅ Index is fresh: nothing changed since the last indexing")
+            print("   Use --refresh-index to rebuild it from scratch")
+            return
+        generator.clean_cache()  # Clean cache only if --refresh-index
+        await generator.start_clangd()
+        await generator.initialize_lsp()
+
+        await generator.trigger_indexing_by_opening_file()
+
+        # Wait for indexing to complete (no timeout)
+        await generator.wait_for_indexing_completion()
+
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n🛑 Interrupted by user")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        await generator.shutdown()
+        print("👋 Done!")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate clangd index")
     parser.add_argument("build_directory",
@@ -1126,6 +1602,21 @@ def main():
                         "investigation (optional)")
     parser.add_argument("--verbose", action="store_true",
                         help="Show detailed clangd logs and progress messages")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 0,
+                        help="Number of clangd worker threads; scales with the "
+                        "core count by default (%(default)s here), 0 keeps "
+                        "clangd's own default")
+    parser.add_argument("--pch-storage", choices=["memory", "disk"],
+                        default="memory",
+                        help="Where clangd keeps preambles (default: memory)")
+    parser.add_argument("--background-index-priority",
+                        choices=["background", "low", "normal"],
+                        default="normal",
+                        help="Scheduling priority of clangd's indexing threads "
+                        "(default: normal; use 'low' with clangd < 13)")
+    parser.add_argument("--verify-clangd", action="store_true",
+                        help="Also run 'clangd --version' to check that the "
+                        "binary works (result cached per binary)")
 
     args = parser.parse_args()
 
@@ -1160,42 +1651,25 @@ def main():
         print("  3. Install clangd at /usr/bin/clangd")
         sys.exit(1)
 
-    # Verify the clangd path works
-    try:
-        subprocess.run([clangd_path, "--version"],
-                       capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Verify the clangd path points to an executable; running it is only
+    # needed when explicitly requested
+    resolved = shutil.which(clangd_path)
+    if not resolved or not os.access(resolved, os.X_OK):
         print(f"Error: clangd not found or not executable at '{clangd_path}'")
         sys.exit(1)
 
-    generator = ClangdIndexGenerator(
-        args.build_directory, clangd_path, args.refresh_index, args.log_file, args.verbose)
+    if args.verify_clangd and not verify_clangd(clangd_path):
+        print(f"Error: clangd at '{clangd_path}' failed to run")
+        sys.exit(1)
 
     try:
-        print("=" * 60)
-        print("🎯 clangd Index Generator")
-        print("=" * 60)
-
-        generator.load_compile_commands_info()  # Load files for information
-        generator.clean_cache()  # Clean cache only if --refresh-index
-        generator.start_clangd()
-        time.sleep(1)
-
-        generator.initialize_lsp()
-        time.sleep(2)
-
-        generator.trigger_indexing_by_opening_file()
-
-        # Wait for indexing to complete (no timeout)
-        generator.wait_for_indexing_completion()
-
+        asyncio.run(run(ClangdIndexGenerator(
+            args.build_directory, clangd_path, args.refresh_index, args.log_file,
+            args.verbose, args.jobs, args.pch_storage,
+            args.background_index_priority)))
     except KeyboardInterrupt:
-        print("\n🛑 Interrupted by user")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    finally:
-        generator.shutdown()
-        print("👋 Done!")
+        # Already reported and cleaned up inside run()
+        pass
 
 
 if __name__ == "__main__":
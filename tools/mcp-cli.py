@@ -7,26 +7,161 @@ from the command line, supporting all available tools with comprehensive
 argument handling and pretty-formatted output.
 """
 
-import argparse
-import json
-import subprocess
+import functools
+import importlib.util
 import sys
 import os
-from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-from uuid import uuid4
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, NamedTuple, Optional, Any, Union
 
+# Responses are decoded with _loads() and displayed through _dumps(), which
+# indents by two spaces, or printed with _print_json(); requests are encoded
+# compactly by _encode(). orjson is used when installed
 try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    from rich.syntax import Syntax
-    from rich.tree import Tree
-    from rich import print as rprint
-    RICH_AVAILABLE = True
+    import orjson
+
+    _loads = orjson.loads
+    _encode = orjson.dumps
+
+    def _dumps(obj: Any) -> str:
+        """Format a JSON value for display, indented by two spaces"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+    def _print_json(obj: Any) -> None:
+        """Print a JSON value indented by two spaces, as bytes (no str round trip)"""
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 except ImportError:
-    RICH_AVAILABLE = False
-    console = None
+    import json
+
+    _loads = json.loads
+
+    def _encode(obj: Any) -> bytes:
+        """Encode a JSON value compactly, for the wire"""
+        return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+    def _dumps(obj: Any) -> str:
+        """Format a JSON value for display, indented by two spaces"""
+        return json.dumps(obj, indent=2)
+
+    def _print_json(obj: Any) -> None:
+        """Print a JSON value indented by two spaces"""
+        print(json.dumps(obj, indent=2))
+
+# rich pulls in dozens of modules, so each class is only imported once output
+# actually uses it (see _rich); --raw-output never loads rich at all
+RICH_AVAILABLE = importlib.util.find_spec("rich") is not None
+
+_RICH_MODULES = {
+    "Console": "rich.console",
+    "Table": "rich.table",
+    "Panel": "rich.panel",
+    "Syntax": "rich.syntax",  # Imports pygments: only documentation and JSON need it
+    "Text": "rich.text",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _rich(name: str):
+    """Import a rich class by name on first use"""
+    return getattr(importlib.import_module(_RICH_MODULES[name]), name)
+
+
+@functools.lru_cache(maxsize=None)
+def _console():
+    """Return the process-wide rich Console, created on first use
+
+    Creating one probes the terminal size and color support, which only
+    needs to happen once however often output is formatted.
+    """
+    return _rich("Console")()
+
+
+@functools.lru_cache(maxsize=8)
+def _syntax_style(language: str, theme: str):
+    """Return the Pygments lexer and rich theme for Syntax, built once per process"""
+    from pygments.lexers import get_lexer_by_name
+    return get_lexer_by_name(language), _rich("Syntax").get_theme(theme)
+
+
+# Table layouts per command: Table keyword arguments and (header, column options)
+_TABLE_LAYOUTS = {
+    "list-tools": (
+        {"title": "Available MCP Tools", "show_header": True, "header_style": "bold magenta"},
+        (("Tool Name", {"style": "cyan", "width": 20}),
+         ("Description", {"style": "white"}),
+         ("Input Schema", {"style": "green", "width": 30})),
+    ),
+    "search-symbols": (
+        {"show_header": True, "header_style": "bold magenta"},
+        (("Symbol", {"style": "cyan", "width": 25}),
+         ("Kind", {"style": "blue", "width": 12}),
+         ("Location", {"style": "green", "width": 25}),
+         ("Container", {"style": "yellow", "width": 25})),
+    ),
+    "get-project-details": (
+        {"show_header": True, "header_style": "bold yellow",
+         "title_style": "bold yellow", "title_justify": "left"},
+        (("#", {"style": "bold cyan", "justify": "right"}),
+         ("Build Dir", {"style": "bold cyan"}),
+         ("Source", {}),
+         ("Generator", {}),
+         ("Build Type", {}),
+         ("Compile DB", {}),
+         ("Build Options", {"style": "dim"})),
+    ),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _table_template(command: str):
+    """Build a command's table layout once, with its styles already parsed"""
+    from rich.style import Style
+    Table = _rich("Table")
+    table_options, columns = _TABLE_LAYOUTS[command]
+    table = Table(**{key: Style.parse(value) if key.endswith("style") else value
+                     for key, value in table_options.items()})
+    for header, column_options in columns:
+        table.add_column(header, **{key: Style.parse(value) if key == "style" else value
+                                    for key, value in column_options.items()})
+    return table
+
+
+def _new_table(command: str):
+    """Return an empty table laid out like the command's template"""
+    import copy
+    table = copy.copy(_table_template(command))
+    table.columns = [column.copy() for column in table.columns]
+    table.rows = []
+    return table
+
+
+# Seconds to wait for a response, on top of any wait_timeout given to a tool
+REQUEST_TIMEOUT = 60
+
+# Requests of a batch that may await their response at once. Unbounded, a
+# large batch could fill the server's stdout while we are still blocked
+# writing to its stdin, and neither side would make progress
+MAX_IN_FLIGHT = 16
+
+
+def _wait_timeout(params: Optional[Dict]) -> float:
+    """Return the seconds a tools/call request lets the server wait for indexing"""
+    return ((params or {}).get("arguments") or {}).get("wait_timeout") or 0
+
+
+def _encode_request(request_id: int, method: str, params: Optional[Dict] = None) -> bytes:
+    """Encode one newline-terminated JSON-RPC request
+
+    The envelope has a fixed shape, so it is written as a template and only
+    the method and params go through the JSON encoder.
+    """
+    head = b'{"jsonrpc":"2.0","id":%d,"method":%s' % (request_id, _encode(method))
+    if not params:
+        return head + b'}\n'
+    return head + b',"params":' + _encode(params) + b'}\n'
 
 
 class McpCliError(Exception):
@@ -34,313 +169,703 @@ class McpCliError(Exception):
     pass
 
 
+def _server_error(response: Dict) -> McpCliError:
+    """Turn the error member of a JSON-RPC response into an McpCliError"""
+    error = response["error"]
+    return McpCliError(f"Server error ({error.get('code', 'unknown')}): {error.get('message', 'Unknown error')}")
+
+
 class McpClient:
-    """JSON-RPC client for communicating with the MCP server"""
+    """JSON-RPC client for communicating with the MCP server
+
+    One server process is started on first use (or on entering the client as
+    a context manager) and serves every request until close(), which also
+    runs at exit for clients used without `with`. Messages are
+    newline-delimited JSON, as in the MCP stdio transport.
+    """
     
     def __init__(self, server_path: str):
         self.server_path = server_path
-        self.console = Console() if RICH_AVAILABLE else None
-        
-    def _validate_server(self) -> None:
-        """Validate that the MCP server exists and is executable"""
-        if not os.path.exists(self.server_path):
-            raise McpCliError(f"MCP server not found at: {self.server_path}")
-        if not os.access(self.server_path, os.X_OK):
-            raise McpCliError(f"MCP server is not executable: {self.server_path}")
-    
-    def _send_request(self, method: str, params: Optional[Dict] = None) -> Dict:
-        """Send a JSON-RPC request to the MCP server and return the response"""
-        self._validate_server()
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": str(uuid4()),
-            "method": method
-        }
-        
-        if params:
-            request["params"] = params
-            
+        self.process = None
+        self._selector = None  # Waits for server output with a deadline (POSIX)
+        self._chunks = None  # Server output read by a thread (Windows)
+        self._buffer = bytearray()  # Server output not yet split into messages
+        self._next_id = 0  # JSON-RPC allows integer ids
+
+    def __enter__(self) -> "McpClient":
+        self._start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start(self) -> None:
+        """Start the MCP server process if it is not running yet"""
+        import atexit
+        import selectors
+        import subprocess
+
+        if self.process is not None:
+            return
+        # No existence/permission pre-check: exec reports both anyway
         try:
-            # Start the MCP server process
-            process = subprocess.Popen(
+            self.process = subprocess.Popen(
                 [self.server_path],
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.DEVNULL,  # Discard stderr as requested
-                text=True
+                stderr=subprocess.DEVNULL  # Discard stderr as requested
             )
-            
-            # Send the request
-            request_json = json.dumps(request)
-            stdout, _ = process.communicate(input=request_json)
-            
-            if process.returncode != 0:
-                raise McpCliError(f"MCP server exited with code {process.returncode}")
-            
-            # Parse the response
+        except FileNotFoundError:
+            raise McpCliError(f"MCP server not found at: {self.server_path}")
+        except PermissionError:
+            raise McpCliError(f"MCP server is not executable: {self.server_path}")
+        if os.name == "nt":
+            # select() only takes sockets on Windows: a thread reads the pipe
+            # and hands the chunks over through a queue instead
+            import queue
+            import threading
+            self._chunks = queue.Queue()
+            threading.Thread(target=self._pump, args=(self.process.stdout, self._chunks), daemon=True).start()
+        else:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.process.stdout, selectors.EVENT_READ)
+        self._buffer.clear()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """Stop the MCP server: closing its stdin lets it exit on its own"""
+        import atexit
+        import subprocess
+
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        atexit.unregister(self.close)
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        self._chunks = None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    
+    @staticmethod
+    def _pump(stdout, chunks) -> None:
+        """Move server output into `chunks` until EOF, which is passed on as b"" (Windows)"""
+        while True:
+            try:
+                chunk = os.read(stdout.fileno(), 65536)
+            except (OSError, ValueError):
+                chunk = b""  # The pipe was closed under us
+            chunks.put(chunk)
+            if not chunk:
+                return
+
+    def _read_chunk(self, timeout: float) -> Optional[bytes]:
+        """Return the next chunk of server output, b"" at EOF or None on timeout"""
+        if self._chunks is not None:
+            import queue
             try:
-                response = json.loads(stdout.strip())
-            except json.JSONDecodeError as e:
+                return self._chunks.get(timeout=timeout)
+            except queue.Empty:
+                return None
+        if not self._selector.select(timeout):
+            return None
+        return os.read(self.process.stdout.fileno(), 65536)
+
+    def _read_message(self, deadline: float) -> bytearray:
+        """Return the next newline-delimited message from the server
+
+        stdout is read in chunks straight from the pipe once the selector
+        reports data (on Windows, from a reader thread), so a hung server
+        raises a timeout at `deadline` instead of blocking forever. The server is killed in that case.
+        Only newly read bytes are searched for the newline, so a multi-MB
+        response is scanned once rather than once per chunk.
+        """
+        process = self.process
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end >= 0:
+                message = self._buffer[:end]  # Both JSON decoders take a bytearray
+                del self._buffer[:end + 1]
+                return message
+            start = len(self._buffer)
+
+            remaining = deadline - time.monotonic()
+            chunk = self._read_chunk(remaining) if remaining > 0 else None
+            if chunk is None:
+                process.kill()
+                raise McpCliError("MCP server timed out")
+            if not chunk:
+                raise McpCliError(f"MCP server exited with code {process.wait()}")
+            self._buffer += chunk
+
+    def _write(self, data: bytes) -> None:
+        """Write encoded requests to the server's stdin"""
+        process = self.process
+        try:
+            process.stdin.write(data)
+            process.stdin.flush()
+        except BrokenPipeError:
+            raise McpCliError(f"MCP server exited with code {process.wait()}")
+
+    def _send_request(self, method: str, params: Optional[Dict] = None,
+                      timeout: float = REQUEST_TIMEOUT, raw: bool = False) -> Union[Dict, bytes]:
+        """Send a JSON-RPC request to the MCP server and return the response
+
+        With `raw`, the response is returned as the server sent it (one line
+        of JSON, without the newline) once it is known not to be an error.
+        """
+        self._start()
+        deadline = time.monotonic() + timeout
+        
+        self._next_id += 1
+        request_id = self._next_id
+        self._write(_encode_request(request_id, method, params))
+
+        # Skip notifications and unrelated messages until our response arrives
+        while True:
+            line = self._read_message(deadline)
+            if not line.strip():
+                continue
+
+            # Parse the response straight from bytes, no separate decode pass
+            try:
+                response = _loads(line)
+            except ValueError as e:  # JSONDecodeError or invalid UTF-8
                 raise McpCliError(f"Invalid JSON response from server: {e}")
+            if isinstance(response, dict) and response.get("id") == request_id:
+                break
                 
-            # Check for JSON-RPC errors
-            if "error" in response:
-                error = response["error"]
-                raise McpCliError(f"Server error ({error.get('code', 'unknown')}): {error.get('message', 'Unknown error')}")
-                
-            return response
+        # Check for JSON-RPC errors
+        if "error" in response:
+            raise _server_error(response)
             
-        except subprocess.TimeoutExpired:
-            raise McpCliError("MCP server timed out")
-        except FileNotFoundError:
-            raise McpCliError(f"Could not execute MCP server: {self.server_path}")
-    
-    def list_tools(self) -> Dict:
-        """List available tools"""
-        return self._send_request("tools/list")
+        return bytes(line) if raw else response
+
+    def send_batch(self, calls: List[tuple], timeout: Optional[float] = None) -> List[Union[Dict, McpCliError]]:
+        """Send several (method, params) requests at once
+
+        Up to MAX_IN_FLIGHT requests are pipelined at a time, topped up as
+        responses come in, and the responses are matched back by id in
+        whatever order they arrive, so the round trips overlap instead of
+        adding up. Returns one entry per call, in call order: the response,
+        or the McpCliError for a call the server rejected.
+        The default timeout allows for every call's indexing wait, since the
+        server may work through them one after another.
+        """
+        if timeout is None:
+            timeout = REQUEST_TIMEOUT + sum(_wait_timeout(params) for _, params in calls)
+        self._start()
+        deadline = time.monotonic() + timeout
+
+        # Ids are consecutive, so a response's id is also its result index
+        first_id = self._next_id + 1
+        self._next_id += len(calls)
+        requests = [_encode_request(first_id + offset, method, params)
+                    for offset, (method, params) in enumerate(calls)]
+
+        results: List[Union[Dict, McpCliError, None]] = [None] * len(calls)
+        sent = received = 0
+        while received < len(calls):
+            # Top the window up before waiting for the next response
+            window_end = min(received + MAX_IN_FLIGHT, len(calls))
+            if sent < window_end:
+                self._write(b"".join(requests[sent:window_end]))
+                sent = window_end
+            line = self._read_message(deadline)
+            if not line.strip():
+                continue
+            try:
+                response = _loads(line)
+            except ValueError as e:
+                raise McpCliError(f"Invalid JSON response from server: {e}")
+            if not isinstance(response, dict) or not isinstance(response.get("id"), int):
+                continue  # Notification or unrelated message
+            index = response["id"] - first_id
+            if 0 <= index < sent and results[index] is None:
+                results[index] = _server_error(response) if "error" in response else response
+                received += 1
+        return results
+
+    def list_tools(self, raw: bool = False) -> Union[Dict, bytes]:
+        """List available tools (as the server's JSON bytes with `raw`)"""
+        return self._send_request("tools/list", raw=raw)
     
-    def call_tool(self, name: str, arguments: Dict) -> Dict:
-        """Call a specific tool with arguments"""
+    def call_tool(self, name: str, arguments: Dict, raw: bool = False) -> Union[Dict, bytes]:
+        """Call a specific tool with arguments (see list_tools for `raw`)"""
         params = {
             "name": name,
             "arguments": arguments
         }
-        return self._send_request("tools/call", params)
+        # Leave room for the server-side wait for indexing
+        timeout = REQUEST_TIMEOUT + _wait_timeout(params)
+        return self._send_request("tools/call", params, timeout=timeout, raw=raw)
 
 
 def find_server_binary() -> str:
-    """Find the MCP server binary in PATH"""
+    """Find the MCP server binary
+
+    MCP_CPP_SERVER_PATH is checked first so wrapper scripts can skip the PATH
+    scan.
+    """
+    server_path = os.environ.get("MCP_CPP_SERVER_PATH")
+    if server_path and os.access(server_path, os.X_OK):
+        return server_path
+
     import shutil
-    if shutil.which("mcp-cpp-server"):
-        return "mcp-cpp-server"
+    server_path = shutil.which("mcp-cpp-server")
+    if server_path:
+        return server_path
     
-    raise McpCliError("Could not find mcp-cpp-server binary. Please install it in PATH or specify --server-path")
+    raise McpCliError("Could not find mcp-cpp-server binary. Please install it in PATH, set MCP_CPP_SERVER_PATH or specify --server-path")
+
+
+class _Option(NamedTuple):
+    """Command line option: `kind` is "flag", "+" (one or more values) or a
+    converter applied to the single value"""
+    dest: str
+    kind: Any
+    help: str
+    metavar: Optional[str] = None
+    default: Any = None
+    choices: Optional[range] = None
+
+
+class _Command(NamedTuple):
+    """Subcommand: an optional positional (name, required, help) plus options"""
+    help: str
+    positional: Optional[tuple]
+    options: Dict[str, _Option]
+
+
+_WAIT_TIMEOUT_HELP = "Timeout for waiting on indexing completion in seconds (default: 20, 0 = no wait)"
+
+_GLOBAL_OPTIONS = {
+    "--raw-output": _Option("raw_output", "flag", "Output raw JSON instead of pretty-formatted text"),
+    "--pretty-json": _Option("pretty_json", "flag", "Pretty print the 'text' field of JSON-RPC response as formatted JSON"),
+    "--server-path": _Option("server_path", str, "Path to the MCP server binary (auto-detected by default)"),
+}
+
+_COMMANDS = {
+    "list-tools": _Command("List available MCP tools", None, {}),
+    "search-symbols": _Command(
+        "Search for C++ symbols in the codebase",
+        ("query", False, "Search query (supports fuzzy matching and qualified names). Use empty string \"\" with --files to list all symbols in specified files."),
+        {
+            "--kinds": _Option("kinds", "+", "Filter by symbol types (class, function, method, variable, etc.)"),
+            "--files": _Option("files", "+", "Limit search to specific files"),
+            "--max-results": _Option("max_results", int, "Maximum number of results to return (1-1000, default: 100)", default=100),
+            "--include-external": _Option("include_external", "flag", "Include symbols from external/system libraries"),
+            "--build-directory": _Option("build_directory", str, "Specify build directory path"),
+            "--wait-timeout": _Option("wait_timeout", int, _WAIT_TIMEOUT_HELP),
+        }),
+    "analyze-symbol": _Command(
+        "Perform comprehensive analysis of a C++ symbol",
+        ("symbol", True, "Symbol name to analyze (e.g., 'Math', 'std::vector', 'MyClass::method')"),
+        {
+            "--max-examples": _Option("max_examples", int, "Maximum number of usage examples to include (unlimited by default)"),
+            "--build-directory": _Option("build_directory", str, "Specify build directory path containing compile_commands.json"),
+            "--no-code": _Option("no_code", "flag", "Don't extract and display source code snippets"),
+            "--show-all-members": _Option("show_all_members", "flag", "Show all class members instead of just a summary (useful for classes with many members)"),
+            "--location-hint": _Option("location_hint", str, "Location hint for disambiguating overloaded symbols (format: /path/file.cpp:line:column, 1-based)"),
+            "--wait-timeout": _Option("wait_timeout", int, _WAIT_TIMEOUT_HELP),
+        }),
+    "get-project-details": _Command(
+        "Get comprehensive project analysis including build configurations and global compilation database",
+        None,
+        {
+            "--path": _Option("path", str, "Project root path to scan (triggers fresh scan if different from server default)"),
+            "--depth": _Option("depth", int, "Scan depth for component discovery (triggers fresh scan if different from server default)",
+                               metavar="0-10", choices=range(0, 11)),
+            "--include-details": _Option("include_details", "flag", "Include detailed build options and configuration variables (default: false to prevent context window exhaustion)"),
+        }),
+    "batch": _Command(
+        "Send several requests in one round trip and print all responses as JSON",
+        None,
+        {
+            "--file": _Option("file", str, "JSON array of {\"method\": ..., \"params\": ...} requests ('-' reads stdin)"),
+        }),
+    "repl": _Command("Read commands from stdin and run them against one server process", None, {}),
+}
 
+USAGE = ("usage: %(prog)s [-h] [--raw-output | --pretty-json] [--server-path SERVER_PATH]\n"
+         "       {list-tools,search-symbols,analyze-symbol,get-project-details,batch,repl} ...\n")
 
-def create_parser() -> argparse.ArgumentParser:
-    """Create the argument parser with all subcommands"""
-    parser = argparse.ArgumentParser(
-        description="Command line interface for the C++ MCP Server",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+HELP = USAGE + """
+Command line interface for the C++ MCP Server
+
+commands:
+  list-tools            List available MCP tools
+  search-symbols        Search for C++ symbols in the codebase
+  analyze-symbol        Perform comprehensive analysis of a C++ symbol
+  get-project-details   Get comprehensive project analysis including build
+                        configurations and global compilation database
+  batch                 Send several requests in one round trip and print all
+                        responses as JSON
+  repl                  Read commands from stdin and run them against one
+                        server process
+
+options:
+  -h, --help            show this help message and exit
+  --raw-output          Output raw JSON instead of pretty-formatted text
+  --pretty-json         Pretty print the 'text' field of JSON-RPC response as
+                        formatted JSON
+  --server-path SERVER_PATH
+                        Path to the MCP server binary (auto-detected by
+                        default)
+
+Use '%(prog)s <command> --help' for the options of a command.
+"""
+
+EPILOG = """
 Examples:
   %(prog)s list-tools
   %(prog)s search-symbols Math --max-results 20
   %(prog)s analyze-symbol "Math::sqrt" --max-examples 3
   %(prog)s get-project-details --pretty-json
-        """
-    )
-    
-    # Global options
-    output_group = parser.add_mutually_exclusive_group()
-    output_group.add_argument(
-        "--raw-output",
-        action="store_true",
-        help="Output raw JSON instead of pretty-formatted text"
-    )
-    output_group.add_argument(
-        "--pretty-json",
-        action="store_true",
-        help="Pretty print the 'text' field of JSON-RPC response as formatted JSON"
-    )
-    parser.add_argument(
-        "--server-path",
-        type=str,
-        help="Path to the MCP server binary (auto-detected by default)"
-    )
-    
-    # Subcommands
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
-    
-    # list-tools subcommand
-    list_tools_parser = subparsers.add_parser(
-        "list-tools",
-        help="List available MCP tools"
-    )
-    
-    # search-symbols subcommand
-    search_parser = subparsers.add_parser(
-        "search-symbols",
-        help="Search for C++ symbols in the codebase"
-    )
-    search_parser.add_argument(
-        "query",
-        nargs="?",
-        default="",
-        help="Search query (supports fuzzy matching and qualified names). Use empty string \"\" with --files to list all symbols in specified files."
-    )
-    search_parser.add_argument(
-        "--kinds",
-        nargs="+",
-        help="Filter by symbol types (class, function, method, variable, etc.)"
-    )
-    search_parser.add_argument(
-        "--files",
-        nargs="+",
-        help="Limit search to specific files"
-    )
-    search_parser.add_argument(
-        "--max-results",
-        type=int,
-        default=100,
-        help="Maximum number of results to return (1-1000, default: 100)"
-    )
-    search_parser.add_argument(
-        "--include-external",
-        action="store_true",
-        help="Include symbols from external/system libraries"
-    )
-    search_parser.add_argument(
-        "--build-directory",
-        type=str,
-        help="Specify build directory path"
-    )
-    search_parser.add_argument(
-        "--wait-timeout",
-        type=int,
-        help="Timeout for waiting on indexing completion in seconds (default: 20, 0 = no wait)"
-    )
-    
-    # analyze-symbol subcommand
-    analyze_parser = subparsers.add_parser(
-        "analyze-symbol",
-        help="Perform comprehensive analysis of a C++ symbol"
-    )
-    analyze_parser.add_argument(
-        "symbol",
-        help="Symbol name to analyze (e.g., 'Math', 'std::vector', 'MyClass::method')"
-    )
-    analyze_parser.add_argument(
-        "--max-examples",
-        type=int,
-        help="Maximum number of usage examples to include (unlimited by default)"
-    )
-    analyze_parser.add_argument(
-        "--build-directory",
-        type=str,
-        help="Specify build directory path containing compile_commands.json"
-    )
-    analyze_parser.add_argument(
-        "--no-code",
-        action="store_true",
-        help="Don't extract and display source code snippets"
-    )
-    analyze_parser.add_argument(
-        "--show-all-members",
-        action="store_true",
-        help="Show all class members instead of just a summary (useful for classes with many members)"
-    )
-    analyze_parser.add_argument(
-        "--location-hint",
-        type=str,
-        help="Location hint for disambiguating overloaded symbols (format: /path/file.cpp:line:column, 1-based)"
-    )
-    analyze_parser.add_argument(
-        "--wait-timeout",
-        type=int,
-        help="Timeout for waiting on indexing completion in seconds (default: 20, 0 = no wait)"
-    )
+  %(prog)s batch --file calls.json
+  %(prog)s repl
+"""
+
+
+def _option_metavar(flag: str, option: _Option) -> str:
+    """Return the usage form of an option, e.g. '--kinds KINDS [KINDS ...]'"""
+    if option.kind == "flag":
+        return flag
+    metavar = option.metavar or option.dest.upper()
+    if option.kind == "+":
+        return f"{flag} {metavar} [{metavar} ...]"
+    return f"{flag} {metavar}"
+
+
+def _command_help(prog: str, name: str) -> str:
+    """Render the help text of a subcommand from its option table"""
+    import textwrap  # Only needed for --help
+
+    command = _COMMANDS[name]
+    usage = [f"[{_option_metavar(flag, option)}]" for flag, option in command.options.items()]
+    entries = [("", "-h, --help", "show this help message and exit")]
+    entries += [("", _option_metavar(flag, option), option.help)
+                for flag, option in command.options.items()]
+    if command.positional:
+        positional, required, positional_help = command.positional
+        usage.append(positional if required else f"[{positional}]")
+        entries.insert(0, ("positional arguments:", positional, positional_help))
+
+    # Wrap the usage line between items, never inside one
+    lines = [f"usage: {prog} {name} [-h]"]
+    indent = " " * (len(lines[0]) - 5)
+    for item in usage:
+        if len(lines[-1]) + len(item) >= 79:
+            lines.append(indent)
+        lines[-1] += f" {item}"
+    lines += [""] + textwrap.wrap(command.help, 79)
+    section = None
+    for title, left, text in entries:
+        title = title or "options:"
+        if title != section:
+            lines += ["", title]
+            section = title
+        wrapped = textwrap.wrap(text, 55)
+        if len(left) > 20:
+            lines.append(f"  {left}")
+        else:
+            lines.append(f"  {left:<20}  {wrapped.pop(0)}")
+        lines += [f"  {'':<20}  {line}" for line in wrapped]
+    return "\n".join(lines) + "\n"
+
+
+def _usage_error(prog: str, message: str, command: Optional[str] = None) -> None:
+    """Report a command line error the way argparse does and exit with 2"""
+    if command:
+        prog = f"{prog} {command}"
+        sys.stderr.write(f"usage: {prog} [-h] ...\n")
+    else:
+        sys.stderr.write(USAGE % {"prog": prog})
+    sys.stderr.write(f"{prog}: error: {message}\n")
+    sys.exit(2)
+
+
+def _consume_option(prog: str, command: Optional[str], options: Dict[str, _Option],
+                    argv: List[str], i: int, args: SimpleNamespace) -> int:
+    """Store the option at argv[i] (and its values) on args
+
+    Handles `--foo value`, `--foo=value`, `--flag` and one-or-more values,
+    which run up to the next token starting with '-'. A single value is
+    always the next token, so negative numbers work. As with argparse, a
+    unique prefix of an option stands for the option. Returns the index of
+    the next unconsumed token.
+    """
+    flag, has_value, value = argv[i].partition("=")
+    option = options.get(flag)
+    if option is None:
+        matches = [name for name in options if name.startswith(flag)] if flag.startswith("--") else []
+        if len(matches) > 1:
+            _usage_error(prog, f"ambiguous option: {flag} could match {', '.join(matches)}", command)
+        if not matches:
+            _usage_error(prog, f"unrecognized arguments: {argv[i]}", command)
+        flag = matches[0]
+        option = options[flag]
+    i += 1
+
+    if option.kind == "flag":
+        if has_value:
+            _usage_error(prog, f"argument {flag}: ignored explicit argument '{value}'", command)
+        setattr(args, option.dest, True)
+        return i
+
+    if has_value:
+        values = [value]
+    elif option.kind != "+":
+        values = argv[i:i + 1]
+        i += len(values)
+    else:
+        end = i
+        while end < len(argv) and (argv[end] == "-" or not argv[end].startswith("-")):
+            end += 1
+        values = argv[i:end]
+        i = end
+    if not values:
+        expected = "at least one argument" if option.kind == "+" else "one argument"
+        _usage_error(prog, f"argument {flag}: expected {expected}", command)
+
+    if option.kind == "+":
+        setattr(args, option.dest, values)
+        return i
+
+    try:
+        converted = option.kind(values[0])
+    except ValueError:
+        _usage_error(prog, f"argument {flag}: invalid {option.kind.__name__} value: '{values[0]}'", command)
+    if option.choices is not None and converted not in option.choices:
+        choices = ", ".join(map(str, option.choices))
+        _usage_error(prog, f"argument {flag}: invalid choice: {converted} (choose from {choices})", command)
+    setattr(args, option.dest, converted)
+    return i
+
+
+def parse_args(argv: Optional[List[str]] = None) -> SimpleNamespace:
+    """Parse the command line into a namespace with one attribute per option
+
+    A small table-driven dispatcher instead of argparse: the CLI mostly runs
+    a single short request, so building a full argparse tree (and its help
+    formatters) on every start was a noticeable part of the run time. Global
+    options come before the command, as with the previous argparse layout.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    prog = os.path.basename(sys.argv[0])
+    args = SimpleNamespace(command=None)
+    for option in _GLOBAL_OPTIONS.values():
+        setattr(args, option.dest, False if option.kind == "flag" else option.default)
+
+    i = 0
+    while i < len(argv) and argv[i].startswith("-"):
+        if argv[i] in ("-h", "--help"):
+            sys.stdout.write(HELP % {"prog": prog} + EPILOG % {"prog": prog})
+            sys.exit(0)
+        i = _consume_option(prog, None, _GLOBAL_OPTIONS, argv, i, args)
+    if args.raw_output and args.pretty_json:
+        _usage_error(prog, "argument --pretty-json: not allowed with argument --raw-output")
+    if i == len(argv):
+        return args
+
+    name = argv[i]
+    command = _COMMANDS.get(name)
+    if command is None:
+        choices = ", ".join(f"'{choice}'" for choice in _COMMANDS)
+        _usage_error(prog, f"argument command: invalid choice: '{name}' (choose from {choices})")
+    args.command = name
+    for option in command.options.values():
+        setattr(args, option.dest, False if option.kind == "flag" else option.default)
+
+    positionals = []
+    i += 1
+    while i < len(argv):
+        token = argv[i]
+        if token in ("-h", "--help"):
+            sys.stdout.write(_command_help(prog, name))
+            sys.exit(0)
+        if token == "--":
+            positionals.extend(argv[i + 1:])
+            break
+        if token.startswith("-") and token != "-":
+            i = _consume_option(prog, name, command.options, argv, i, args)
+        else:
+            positionals.append(token)
+            i += 1
+
+    if command.positional:
+        positional, required, _ = command.positional
+        if positionals:
+            setattr(args, positional, positionals.pop(0))
+        elif required:
+            _usage_error(prog, f"the following arguments are required: {positional}", name)
+        else:
+            setattr(args, positional, "")
+    if positionals:
+        _usage_error(prog, f"unrecognized arguments: {' '.join(positionals)}")
+    return args
+
+
+def _load_batch(path: str) -> List[tuple]:
+    """Read batch requests from a JSON file as (method, params) pairs"""
+    try:
+        if path == "-":
+            calls = _loads(sys.stdin.buffer.read())
+        else:
+            with open(path, "rb") as f:
+                calls = _loads(f.read())
+    except OSError as e:
+        raise McpCliError(f"Cannot read batch file: {e}")
+    except ValueError as e:
+        raise McpCliError(f"Invalid JSON in batch file: {e}")
+
+    if not isinstance(calls, list) or not all(isinstance(call, dict) and isinstance(call.get("method"), str)
+                                              for call in calls):
+        raise McpCliError('Batch file must be a JSON array of {"method": ..., "params": ...} objects')
+    return [(call["method"], call.get("params")) for call in calls]
+
+
+# Tool and arguments per command: each argument is read from the parsed
+# option of the same name and left out when its value is one of `omit`
+_TOOL_CALLS = {
+    "search-symbols": ("search_symbols", (
+        ("query", ()),
+        ("kinds", (None, [])),
+        ("files", (None, [])),
+        ("max_results", (100,)),  # The server's default
+        ("include_external", (False,)),
+        ("build_directory", (None, "")),
+        ("wait_timeout", (None,)),
+    )),
+    "analyze-symbol": ("analyze_symbol_context", (
+        ("symbol", ()),
+        ("max_examples", (None,)),
+        ("build_directory", (None, "")),
+        ("location_hint", (None, "")),
+        ("wait_timeout", (None,)),
+    )),
+    "get-project-details": ("get_project_details", (
+        ("path", (None, "")),
+        ("depth", (None,)),
+        ("include_details", (False,)),
+    )),
+}
+
+
+def _run_command(client: McpClient, args: SimpleNamespace) -> Union[Dict, List, bytes]:
+    """Send the request(s) for a parsed command and return the response"""
+    if args.command == "list-tools":
+        return client.list_tools(raw=args.raw_output)
     
-    # get-project-details subcommand
-    project_details_parser = subparsers.add_parser(
-        "get-project-details",
-        help="Get comprehensive project analysis including build configurations and global compilation database"
-    )
-    project_details_parser.add_argument(
-        "--path",
-        type=str,
-        help="Project root path to scan (triggers fresh scan if different from server default)"
-    )
-    project_details_parser.add_argument(
-        "--depth",
-        type=int,
-        choices=range(0, 11),
-        metavar="0-10",
-        help="Scan depth for component discovery (triggers fresh scan if different from server default)"
-    )
-    project_details_parser.add_argument(
-        "--include-details",
-        action="store_true",
-        help="Include detailed build options and configuration variables (default: false to prevent context window exhaustion)"
-    )
+    if args.command in _TOOL_CALLS:
+        tool, parameters = _TOOL_CALLS[args.command]
+        arguments = {name: value for name, omit in parameters
+                     if (value := getattr(args, name)) not in omit}
+        return client.call_tool(tool, arguments, raw=args.raw_output)
     
-    return parser
+    # batch
+    if not args.file:
+        _usage_error(os.path.basename(sys.argv[0]), "the following arguments are required: --file", "batch")
+    return [result if isinstance(result, dict) else {"error": str(result)}
+            for result in client.send_batch(_load_batch(args.file))]
+
+
+def _print_response(args: SimpleNamespace, response: Union[Dict, List, bytes]) -> None:
+    """Print a command's response in the output format selected by args"""
+    if isinstance(response, bytes):
+        # --raw-output: pass the server's JSON through, no re-encoding
+        sys.stdout.flush()
+        sys.stdout.buffer.write(response + b"\n")
+    elif args.raw_output or args.command == "batch":
+        _print_json(response)
+    elif args.pretty_json:
+        format_pretty_json_output(response)
+    else:
+        # Pass flags for analyze-symbol command
+        show_code = not (args.command == "analyze-symbol" and getattr(args, 'no_code', False))
+        show_all_members = args.command == "analyze-symbol" and getattr(args, 'show_all_members', False)
+        format_output(args.command, response, show_code=show_code, show_all_members=show_all_members)
+
+
+def _repl(client: McpClient, args: SimpleNamespace) -> None:
+    """Run commands read from stdin, one per line, against one server process
+
+    Each line is parsed like a command line (global options may lead it);
+    output options given when starting the REPL apply to lines without any.
+    The server is started once and reused, and restarted if it has died.
+    """
+    import shlex
+
+    prompt = "mcp> " if sys.stdin.isatty() else ""
+    while True:
+        try:
+            line = input(prompt)
+        except EOFError:  # Ctrl-D or end of input
+            break
+        except KeyboardInterrupt:  # Ctrl-C drops the current line
+            print()
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            continue
+        if not argv:
+            continue
+        if argv in (["exit"], ["quit"]):
+            break
+
+        try:
+            command_args = parse_args(argv)
+        except SystemExit:
+            continue  # Usage error or help, already printed
+        if command_args.command in (None, "repl"):
+            print(f"Error: expected one of {', '.join(name for name in _COMMANDS if name != 'repl')}",
+                  file=sys.stderr)
+            continue
+        if not (command_args.raw_output or command_args.pretty_json):
+            command_args.raw_output, command_args.pretty_json = args.raw_output, args.pretty_json
+
+        try:
+            _print_response(command_args, _run_command(client, command_args))
+        except McpCliError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            if client.process is not None and client.process.poll() is not None:
+                client.close()  # The next command starts a new server
+        except SystemExit:
+            pass  # Usage error from the command, already printed
+        sys.stdout.flush()
 
 
 def main():
     """Main entry point"""
-    parser = create_parser()
-    args = parser.parse_args()
+    args = parse_args()
     
     # Show help if no command specified
     if not args.command:
-        parser.print_help()
+        prog = os.path.basename(sys.argv[0])
+        sys.stdout.write(HELP % {"prog": prog} + EPILOG % {"prog": prog})
         sys.exit(1)
     
     try:
         # Find server binary
         server_path = args.server_path or find_server_binary()
-        client = McpClient(server_path)
-        
-        # Execute the appropriate command
-        if args.command == "list-tools":
-            response = client.list_tools()
-            
-        elif args.command == "search-symbols":
-            arguments = {"query": args.query}
-            
-            # Add optional parameters
-            if args.kinds:
-                arguments["kinds"] = args.kinds
-            if args.files:
-                arguments["files"] = args.files
-            if args.max_results != 100:
-                arguments["max_results"] = args.max_results
-            if args.include_external:
-                arguments["include_external"] = args.include_external
-            if args.build_directory:
-                arguments["build_directory"] = args.build_directory
-            if args.wait_timeout is not None:
-                arguments["wait_timeout"] = args.wait_timeout
-                
-            response = client.call_tool("search_symbols", arguments)
-            
-        elif args.command == "analyze-symbol":
-            arguments = {"symbol": args.symbol}
-            
-            # Add optional parameters
-            if args.max_examples is not None:
-                arguments["max_examples"] = args.max_examples
-            if args.build_directory:
-                arguments["build_directory"] = args.build_directory
-            if args.location_hint:
-                arguments["location_hint"] = args.location_hint
-            if args.wait_timeout is not None:
-                arguments["wait_timeout"] = args.wait_timeout
-                
-            response = client.call_tool("analyze_symbol_context", arguments)
-            
-        elif args.command == "get-project-details":
-            arguments = {}
-            if hasattr(args, 'path') and args.path:
-                arguments["path"] = args.path
-            if hasattr(args, 'depth') and args.depth is not None:
-                arguments["depth"] = args.depth
-            if hasattr(args, 'include_details') and args.include_details:
-                arguments["include_details"] = True
-            response = client.call_tool("get_project_details", arguments)
-        
-        # Output the response
-        if args.raw_output:
-            print(json.dumps(response, indent=2))
-        elif args.pretty_json:
-            format_pretty_json_output(response)
-        else:
-            # Pass flags for analyze-symbol command
-            show_code = not (args.command == "analyze-symbol" and getattr(args, 'no_code', False))
-            show_all_members = args.command == "analyze-symbol" and getattr(args, 'show_all_members', False)
-            format_output(args.command, response, show_code=show_code, show_all_members=show_all_members)
+        with McpClient(server_path) as client:
+            if args.command == "repl":
+                _repl(client, args)
+            else:
+                _print_response(args, _run_command(client, args))
             
     except McpCliError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -352,90 +877,128 @@ def main():
         print(f"Unexpected error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # The output is complete and the server has exited; skip the interpreter
+    # teardown (GC of the parsed response, rich cleanup, atexit handlers)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
+
+
+def _use_rich() -> bool:
+    """Tell whether output is styled with rich
+
+    Piped output (e.g. into jq) stays plain unless FORCE_COLOR is set, like
+    rich's own color detection, so no rich layout work is spent on it.
+    """
+    return RICH_AVAILABLE and (sys.stdout.isatty() or bool(os.environ.get("FORCE_COLOR")))
+
 
 def format_output(command: str, response: Dict, show_code: bool = True, show_all_members: bool = False) -> None:
     """Format and display the response in a user-friendly way"""
-    if not RICH_AVAILABLE:
+    if not _use_rich():
         _format_simple_output(response)
     else:
         _format_rich_output(command, response, show_code=show_code, show_all_members=show_all_members)
 
 
+def _extract_text(response: Dict) -> Optional[str]:
+    """Return the first content item's text of a tool call response, or None"""
+    try:
+        return response["result"]["content"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _extract_tools(response: Dict) -> Optional[List[Dict]]:
+    """Return the tools of a tools/list response, or None"""
+    try:
+        return response["result"]["tools"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _has_content(response: Dict) -> bool:
+    """Tell a response with empty content from a malformed one (error paths only)"""
+    result = response.get("result")
+    return isinstance(result, dict) and "content" in result
+
+
 def format_pretty_json_output(response: Dict) -> None:
     """Pretty print the 'text' field of JSON-RPC response as formatted JSON"""
-    if "result" in response and "content" in response["result"]:
-        content = response["result"]["content"]
-        if content and len(content) > 0 and "text" in content[0]:
-            try:
-                # Parse the JSON in the text field
-                data = json.loads(content[0]["text"])
-                # Pretty print it with syntax highlighting if rich is available
-                if RICH_AVAILABLE:
-                    console = Console()
-                    syntax = Syntax(json.dumps(data, indent=2), "json", theme="monokai")
-                    console.print(syntax)
-                else:
-                    print(json.dumps(data, indent=2))
-            except json.JSONDecodeError:
-                # If text field is not valid JSON, just print it as-is
-                print(content[0]["text"])
-        else:
+    text = _extract_text(response)
+    if text is None:
+        if _has_content(response):
             print("No text content found in response")
+        else:
+            print("Invalid response format: missing result or content")
+        return
+
+    try:
+        # Parse the JSON in the text field
+        data = _loads(text)
+    except ValueError:
+        # If text field is not valid JSON, just print it as-is
+        print(text)
+        return
+
+    # Pretty print it with syntax highlighting if rich is available and the
+    # output goes to a terminal
+    if _use_rich():
+        console = _console()
+        lexer, theme = _syntax_style("json", "monokai")
+        syntax = _rich("Syntax")(_dumps(data), lexer, theme=theme)
+        console.print(syntax)
     else:
-        print("Invalid response format: missing result or content")
+        _print_json(data)
 
 
 def _format_simple_output(response: Dict) -> None:
     """Simple text output when rich is not available"""
     # Handle list-tools specially (different response format)
-    if "result" in response and "tools" in response["result"]:
+    if _extract_tools(response) is not None:
         # This is a list-tools response
-        print(json.dumps(response["result"], indent=2))
+        _print_json(response["result"])
         return
     
     # Handle tool call responses
-    if "result" in response and "content" in response["result"]:
-        content = response["result"]["content"]
-        if content and len(content) > 0 and "text" in content[0]:
-            try:
-                data = json.loads(content[0]["text"])
-                print(json.dumps(data, indent=2))
-            except json.JSONDecodeError:
-                print(content[0]["text"])
-        else:
-            print(json.dumps(response, indent=2))
-    else:
-        print(json.dumps(response, indent=2))
+    text = _extract_text(response)
+    if text is None:
+        _print_json(response)
+        return
+    try:
+        _print_json(_loads(text))
+    except ValueError:
+        print(text)
 
 
 def _format_rich_output(command: str, response: Dict, show_code: bool = True, show_all_members: bool = False) -> None:
     """Rich formatted output with colors and tables"""
-    console = Console()
+    console = _console()
+    data = None
     
     try:
         # Handle list-tools specially (different response format)
         if command == "list-tools":
-            if "result" not in response or "tools" not in response["result"]:
+            if _extract_tools(response) is None:
                 console.print("[red]Invalid response format for list-tools[/red]")
                 return
             _format_tools_list(console, response["result"])
             return
         
         # Extract the actual data from MCP response for tool calls
-        if "result" not in response or "content" not in response["result"]:
-            console.print("[red]Invalid response format[/red]")
-            return
-            
-        content = response["result"]["content"]
-        if not content or len(content) == 0 or "text" not in content[0]:
-            console.print("[yellow]No content in response[/yellow]")
+        text = _extract_text(response)
+        if text is None:
+            if _has_content(response):
+                console.print("[yellow]No content in response[/yellow]")
+            else:
+                console.print("[red]Invalid response format[/red]")
             return
             
         try:
-            data = json.loads(content[0]["text"])
-        except json.JSONDecodeError:
+            data = _loads(text)
+        except ValueError:
             console.print("[red]Invalid JSON in response[/red]")
-            console.print(content[0]["text"])
+            console.print(text)
             return
             
         # Format based on command type
@@ -444,17 +1007,39 @@ def _format_rich_output(command: str, response: Dict, show_code: bool = True, sh
         elif command == "search-symbols":
             _format_symbols_search(console, data)
         elif command == "analyze-symbol":
-            _format_symbol_analysis(console, data, show_code=show_code, show_all_members=show_all_members)
+            # The analysis is dozens of small prints: render them into one
+            # buffer and write it to stdout at once
+            with console.capture() as capture:
+                _format_symbol_analysis(console, data, show_code=show_code, show_all_members=show_all_members)
+            sys.stdout.write(capture.get())
         elif command == "get-project-details":
-            _format_project_details(console, data)
+            # Same for the project overview: header, summary and every
+            # provider block go out in a single write
+            with console.capture() as capture:
+                _format_project_details(console, data)
+            sys.stdout.write(capture.get())
         else:
             # Fallback to JSON
-            syntax = Syntax(json.dumps(data, indent=2), "json", theme="monokai")
+            lexer, theme = _syntax_style("json", "monokai")
+            syntax = _rich("Syntax")(_dumps(data), lexer, theme=theme)
             console.print(syntax)
             
     except Exception as e:
         console.print(f"[red]Error formatting output: {e}[/red]")
-        _format_simple_output(response)
+        # Don't parse the text a second time if that already succeeded
+        if data is not None:
+            _print_json(data)
+        else:
+            _format_simple_output(response)
+
+
+def _schema_summary(schema: Dict) -> str:
+    """Summarize a tool's input schema as 'name*: type' lines (* = required)"""
+    if "properties" not in schema:
+        return "No schema"
+    required = set(schema.get("required", ()))
+    return "\n".join(f"{prop}{'*' if prop in required else ''}: {details.get('type', 'unknown')}"
+                     for prop, details in schema["properties"].items())
 
 
 def _format_tools_list(console, data: Dict) -> None:
@@ -463,37 +1048,48 @@ def _format_tools_list(console, data: Dict) -> None:
         console.print("[yellow]No tools found in response[/yellow]")
         return
         
-    table = Table(title="Available MCP Tools", show_header=True, header_style="bold magenta")
-    table.add_column("Tool Name", style="cyan", width=20)
-    table.add_column("Description", style="white")
-    table.add_column("Input Schema", style="green", width=30)
+    table = _new_table("list-tools")
     
-    for tool in data["tools"]:
-        name = tool.get("name", "Unknown")
-        description = tool.get("description", "No description")
-        
-        # Extract input schema info
-        schema_info = "No schema"
-        if "inputSchema" in tool and "properties" in tool["inputSchema"]:
-            props = tool["inputSchema"]["properties"]
-            required = tool["inputSchema"].get("required", [])
-            schema_parts = []
-            for prop, details in props.items():
-                prop_type = details.get("type", "unknown")
-                is_required = prop in required
-                marker = "*" if is_required else ""
-                schema_parts.append(f"{prop}{marker}: {prop_type}")
-            schema_info = "\n".join(schema_parts)
-        
-        table.add_row(name, description, schema_info)
+    # One pass per column, then rows are zipped together
+    tools = data["tools"]
+    names = [tool.get("name", "Unknown") for tool in tools]
+    descriptions = [tool.get("description", "No description") for tool in tools]
+    schemas = [_schema_summary(tool.get("inputSchema") or {}) for tool in tools]
+    
+    for row in zip(names, descriptions, schemas):
+        table.add_row(*row)
     
     console.print(table)
 
 
+_PROGRESS_BAR_WIDTH = 20
+# Every fill level of the index progress bar, indexed by filled cells
+_PROGRESS_BARS = tuple("█" * i + "░" * (_PROGRESS_BAR_WIDTH - i) for i in range(_PROGRESS_BAR_WIDTH + 1))
+
+
+def _count_unit(count: int, unit: str) -> str:
+    """Return e.g. '1 minute' or '3 minutes'"""
+    return f"{count} {unit}" if count == 1 else f"{count} {unit}s"
+
+
+def _format_duration(secs: int) -> str:
+    """Format an ETA in seconds by its two largest units, e.g. '2 minutes 5 seconds'"""
+    if secs < 60:
+        return f"{secs} seconds"
+    hours, rest = divmod(secs, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        major, minor = _count_unit(hours, "hour"), minutes and _count_unit(minutes, "minute")
+    else:
+        major, minor = _count_unit(minutes, "minute"), seconds and _count_unit(seconds, "second")
+    return f"{major} {minor}" if minor else major
+
+
 def _format_index_status(console, index_status: Dict) -> None:
     """Format and display indexing status information with ETA"""
     if not index_status:
         return
+    Panel = _rich("Panel")
     
     in_progress = index_status.get("in_progress", False)
     progress_percentage = index_status.get("progress_percentage")
@@ -502,29 +1098,6 @@ def _format_index_status(console, index_status: Dict) -> None:
     estimated_time_remaining = index_status.get("estimated_time_remaining")
     state = index_status.get("state", "Unknown")
     
-    # Helper function to format duration
-    def format_duration(duration_dict):
-        if not duration_dict or not isinstance(duration_dict, dict):
-            return "unknown"
-        
-        secs = duration_dict.get("secs", 0)
-        if secs < 60:
-            return f"{secs} seconds"
-        elif secs < 3600:
-            minutes = secs // 60
-            remaining_secs = secs % 60
-            if remaining_secs == 0:
-                return f"{minutes} minute{'s' if minutes != 1 else ''}"
-            else:
-                return f"{minutes} minute{'s' if minutes != 1 else ''} {remaining_secs} second{'s' if remaining_secs != 1 else ''}"
-        else:
-            hours = secs // 3600
-            minutes = (secs % 3600) // 60
-            if minutes == 0:
-                return f"{hours} hour{'s' if hours != 1 else ''}"
-            else:
-                return f"{hours} hour{'s' if hours != 1 else ''} {minutes} minute{'s' if minutes != 1 else ''}"
-    
     # Determine color based on state
     if in_progress:
         status_color = "yellow"
@@ -549,9 +1122,8 @@ def _format_index_status(console, index_status: Dict) -> None:
     # Progress bar and percentage
     if progress_percentage is not None and total_files > 0:
         progress = progress_percentage / 100.0
-        bar_width = 20
-        filled = int(bar_width * progress)
-        bar = "█" * filled + "░" * (bar_width - filled)
+        filled = min(max(int(_PROGRESS_BAR_WIDTH * progress), 0), _PROGRESS_BAR_WIDTH)
+        bar = _PROGRESS_BARS[filled]
         status_lines.append(f"Progress: [{status_color}][{bar}] {progress_percentage:.1f}%[/{status_color}]")
     
     # Files count
@@ -560,7 +1132,11 @@ def _format_index_status(console, index_status: Dict) -> None:
     
     # ETA
     if estimated_time_remaining and in_progress:
-        eta_text = format_duration(estimated_time_remaining)
+        # A serialized Rust Duration: {"secs": ..., "nanos": ...}
+        if isinstance(estimated_time_remaining, dict):
+            eta_text = _format_duration(estimated_time_remaining.get("secs", 0))
+        else:
+            eta_text = "unknown"
         status_lines.append(f"ETA: [cyan]{eta_text}[/cyan]")
     
     # State
@@ -573,8 +1149,49 @@ def _format_index_status(console, index_status: Dict) -> None:
     console.print()
 
 
+# Names of the LSP SymbolKind numbers (1-26), indexed by number
+SYMBOL_KIND_NAMES = (
+    None, "File", "Module", "Namespace", "Package", "Class",
+    "Method", "Property", "Field", "Constructor", "Enum",
+    "Interface", "Function", "Variable", "Constant",
+    "String", "Number", "Boolean", "Array", "Object",
+    "Key", "Null", "EnumMember", "Struct", "Event",
+    "Operator", "TypeParameter"
+)
+
+
+def _kind_label(kind) -> str:
+    """Return a symbol kind as text, converting LSP kind numbers to names"""
+    if isinstance(kind, int):
+        if 0 < kind < len(SYMBOL_KIND_NAMES):
+            return SYMBOL_KIND_NAMES[kind]
+        return f"Unknown({kind})"
+    return kind
+
+
+def _location_label(loc, _prefix: str = "file://", _prefix_len: int = 7) -> str:
+    """Return 'file:line' for a symbol location (FileLocation string or LSP Location)"""
+    if isinstance(loc, str):
+        # Handle FileLocation string format: /path/file.cpp:18:7-11
+        if ':' not in loc:
+            return loc.rpartition('/')[2]
+        parts = loc.rsplit(':', 2)  # Split from right to handle paths with colons
+        return f"{parts[0].rpartition('/')[2]}:{parts[1]}"  # Just filename and line
+    if isinstance(loc, dict):
+        # Handle LSP Location object format (legacy support)
+        get = loc.get
+        uri = get("uri", "")
+        name = uri[_prefix_len:].rpartition('/')[2] if uri.startswith(_prefix) else uri
+        start = (get("range") or {}).get("start")
+        if start is not None:
+            return f"{name}:{start.get('line', 0) + 1}"  # Convert to 1-based
+        return name
+    return "Unknown"
+
+
 def _format_symbols_search(console, data: Dict) -> None:
     """Format symbol search results"""
+    Panel = _rich("Panel")
     if not data.get("success", False):
         console.print(f"[red]Search failed: {data.get('error', 'Unknown error')}[/red]")
         return
@@ -606,69 +1223,37 @@ def _format_symbols_search(console, data: Dict) -> None:
         console.print("[yellow]No symbols found[/yellow]")
         return
     
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("Symbol", style="cyan", width=25)
-    table.add_column("Kind", style="blue", width=12)
-    table.add_column("Location", style="green", width=25)
-    table.add_column("Container", style="yellow", width=25)
+    table = _new_table("search-symbols")
+    Text = _rich("Text")
     
-    for symbol in symbols:
-        name = symbol.get("name", "Unknown")
-        kind = symbol.get("kind", "unknown")
-        
-        # Convert LSP symbol kind number to readable string if needed
-        if isinstance(kind, int):
-            kind_names = {
-                1: "File", 2: "Module", 3: "Namespace", 4: "Package", 5: "Class",
-                6: "Method", 7: "Property", 8: "Field", 9: "Constructor", 10: "Enum",
-                11: "Interface", 12: "Function", 13: "Variable", 14: "Constant",
-                15: "String", 16: "Number", 17: "Boolean", 18: "Array", 19: "Object",
-                20: "Key", 21: "Null", 22: "EnumMember", 23: "Struct", 24: "Event",
-                25: "Operator", 26: "TypeParameter"
-            }
-            kind = kind_names.get(kind, f"Unknown({kind})")
-        
-        # Format location - handle FileLocation string format
-        location = "Unknown"
-        if "location" in symbol:
-            loc = symbol["location"]
-            if isinstance(loc, str):
-                # Handle FileLocation string format: /path/file.cpp:18:7-11
-                try:
-                    # Extract just the filename and line number
-                    if ':' in loc:
-                        parts = loc.rsplit(':', 2)  # Split from right to handle paths with colons
-                        if len(parts) >= 2:
-                            file_path = Path(parts[0]).name  # Just filename
-                            line_num = parts[1]
-                            location = f"{file_path}:{line_num}"
-                        else:
-                            location = Path(loc).name
-                    else:
-                        location = Path(loc).name
-                except Exception:
-                    location = str(loc)
-            elif isinstance(loc, dict):
-                # Handle LSP Location object format (legacy support)
-                file_uri = loc.get("uri", "")
-                if file_uri.startswith("file://"):
-                    file_path = Path(file_uri[7:]).name  # Just filename
-                else:
-                    file_path = file_uri
-                    
-                if "range" in loc and "start" in loc["range"]:
-                    line = loc["range"]["start"].get("line", 0) + 1  # Convert to 1-based
-                    location = f"{file_path}:{line}"
-                else:
-                    location = file_path
-        
-        container = symbol.get("container_name", "")
-        
-        table.add_row(name, kind, location, container)
+    # Plain Text cells skip rich's markup parser, and names or containers
+    # that look like markup tags are shown as they are
+    rows = [(Text(symbol.get("name", "Unknown")),
+             Text(_kind_label(symbol.get("kind", "unknown"))),
+             Text(_location_label(symbol["location"]) if "location" in symbol else "Unknown"),
+             Text(symbol.get("container_name", "")))
+            for symbol in symbols]
+    
+    add_row = table.add_row
+    for row in rows:
+        add_row(*row)
     
     console.print(table)
 
 
+@functools.lru_cache(maxsize=64)
+def _source_lines(file_path: str) -> tuple:
+    """Read a source file's lines, once per file: definitions, declarations
+    and usage examples of one symbol mostly point into the same few files
+
+    Lines are split on newlines only (not str.splitlines(), which also
+    breaks at form feeds and other separators and would shift LSP line
+    numbers). A tuple keeps the cached lines immutable.
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return tuple(f)
+
+
 def extract_code_from_location(location_str: str) -> Dict[str, Union[str, int]]:
     """Extract code snippet from FileLocation string format.
     
@@ -700,8 +1285,7 @@ def extract_code_from_location(location_str: str) -> Dict[str, Union[str, int]]:
         
         # Try to read the file and extract the line
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+            lines = _source_lines(file_path)
                 
             if line_num <= 0 or line_num > len(lines):
                 return {"error": f"Line {line_num} out of range", "code": "", "line_number": line_num, "file_path": file_path}
@@ -727,8 +1311,23 @@ def extract_code_from_location(location_str: str) -> Dict[str, Union[str, int]]:
         return {"error": f"Error parsing location: {e}", "code": "", "line_number": 0, "file_path": ""}
 
 
+def _name_of(item) -> str:
+    """Return a hierarchy entry's name; entries are plain names or objects"""
+    return item if isinstance(item, str) else item.get("name", "Unknown")
+
+
+def _print_names(console, title: str, items: List, limit: int) -> None:
+    """Print a titled list of the first `limit` hierarchy entries, the names
+    joined into a single print"""
+    console.print(f"[bold]{title} ({len(items)}):[/bold]")
+    console.print("\n".join([f"  • [cyan]{name}[/cyan]" for name in map(_name_of, items[:limit])]))
+    if len(items) > limit:
+        console.print(f"  ... and {len(items) - limit} more")
+
+
 def _format_symbol_analysis(console, data: Dict, show_code: bool = True, show_all_members: bool = False) -> None:
     """Format symbol analysis results from AnalyzerResult structure"""
+    Panel = _rich("Panel")
     
     # Extract data from AnalyzerResult structure
     symbol_data = data.get("symbol", {})
@@ -751,18 +1350,7 @@ def _format_symbol_analysis(console, data: Dict, show_code: bool = True, show_al
     if symbol_data:
         kind = symbol_data.get("kind")
         if kind:
-            # Convert LSP symbol kind number to readable string if needed
-            if isinstance(kind, int):
-                kind_names = {
-                    1: "File", 2: "Module", 3: "Namespace", 4: "Package", 5: "Class",
-                    6: "Method", 7: "Property", 8: "Field", 9: "Constructor", 10: "Enum",
-                    11: "Interface", 12: "Function", 13: "Variable", 14: "Constant",
-                    15: "String", 16: "Number", 17: "Boolean", 18: "Array", 19: "Object",
-                    20: "Key", 21: "Null", 22: "EnumMember", 23: "Struct", 24: "Event",
-                    25: "Operator", 26: "TypeParameter"
-                }
-                kind = kind_names.get(kind, f"Unknown({kind})")
-            console.print(f"[bold]Kind:[/bold] {kind}")
+            console.print(f"[bold]Kind:[/bold] {_kind_label(kind)}")
         
         fully_qualified_name = symbol_data.get("fully_qualified_name")
         if fully_qualified_name:
@@ -816,7 +1404,8 @@ def _format_symbol_analysis(console, data: Dict, show_code: bool = True, show_al
     # Documentation
     if hover_doc:
         console.print(f"\n[bold]Documentation:[/bold]")
-        syntax = Syntax(hover_doc, "markdown", theme="monokai", line_numbers=False)
+        lexer, theme = _syntax_style("markdown", "monokai")
+        syntax = _rich("Syntax")(hover_doc, lexer, theme=theme, line_numbers=False)
         console.print(Panel(syntax, border_style="dim"))
     
     # Usage examples
@@ -836,28 +1425,10 @@ def _format_symbol_analysis(console, data: Dict, show_code: bool = True, show_al
         subtypes = type_hierarchy.get("subtypes", [])
         
         if supertypes:
-            console.print(f"[bold]Base Types ({len(supertypes)}):[/bold]")
-            for supertype in supertypes[:3]:
-                # Handle both string names and objects
-                if isinstance(supertype, str):
-                    name = supertype
-                else:
-                    name = supertype.get("name", "Unknown")
-                console.print(f"  • [cyan]{name}[/cyan]")
-            if len(supertypes) > 3:
-                console.print(f"  ... and {len(supertypes) - 3} more")
+            _print_names(console, "Base Types", supertypes, 3)
         
         if subtypes:
-            console.print(f"[bold]Derived Types ({len(subtypes)}):[/bold]")
-            for subtype in subtypes[:3]:
-                # Handle both string names and objects
-                if isinstance(subtype, str):
-                    name = subtype
-                else:
-                    name = subtype.get("name", "Unknown")
-                console.print(f"  • [cyan]{name}[/cyan]")
-            if len(subtypes) > 3:
-                console.print(f"  ... and {len(subtypes) - 3} more")
+            _print_names(console, "Derived Types", subtypes, 3)
     
     # Call hierarchy
     if call_hierarchy:
@@ -867,82 +1438,82 @@ def _format_symbol_analysis(console, data: Dict, show_code: bool = True, show_al
         callees = call_hierarchy.get("callees", [])
         
         if callers:
-            console.print(f"[bold]Callers ({len(callers)}):[/bold]")
-            for caller in callers[:5]:
-                # Handle both string names and objects
-                if isinstance(caller, str):
-                    name = caller
-                else:
-                    name = caller.get("name", "Unknown")
-                console.print(f"  • [cyan]{name}[/cyan]")
-            if len(callers) > 5:
-                console.print(f"  ... and {len(callers) - 5} more")
+            _print_names(console, "Callers", callers, 5)
         
         if callees:
-            console.print(f"[bold]Callees ({len(callees)}):[/bold]")
-            for callee in callees[:5]:
-                # Handle both string names and objects
-                if isinstance(callee, str):
-                    name = callee
-                else:
-                    name = callee.get("name", "Unknown")
-                console.print(f"  • [cyan]{name}[/cyan]")
-            if len(callees) > 5:
-                console.print(f"  ... and {len(callees) - 5} more")
+            _print_names(console, "Callees", callees, 5)
     
     # Members (for classes/structs)
     if members:
-        total_members = (len(members.get("methods", [])) + 
-                        len(members.get("constructors", [])) + 
-                        len(members.get("destructors", [])) + 
-                        len(members.get("operators", [])))
+        # Look each group up once; the lists serve both the total and the listing
+        methods = members.get("methods", [])
+        constructors = members.get("constructors", [])
+        destructors = members.get("destructors", [])
+        operators = members.get("operators", [])
+        total_members = len(methods) + len(constructors) + len(destructors) + len(operators)
         
         console.print(f"\n[bold green]Class Members ({total_members} total):[/bold green]")
         
-        # Show methods
-        methods = members.get("methods", [])
+        # Show methods; like the other member lists, they are printed as one
+        # block of markup rather than line by line
         if methods:
             console.print(f"[bold]Methods ({len(methods)}):[/bold]")
             method_limit = len(methods) if show_all_members else 5
-            for method in methods[:method_limit]:
-                name = method.get("name", "Unknown")
-                signature = method.get("signature", "")
-                console.print(f"  • [cyan]{name}[/cyan] {signature}")
+            console.print("\n".join([f"  • [cyan]{method.get('name', 'Unknown')}[/cyan] {method.get('signature', '')}"
+                                     for method in methods[:method_limit]]))
             if len(methods) > method_limit:
                 console.print(f"  ... and {len(methods) - method_limit} more methods")
         
         # Show constructors
-        constructors = members.get("constructors", [])
         if constructors:
             console.print(f"[bold]Constructors ({len(constructors)}):[/bold]")
             constructor_limit = len(constructors) if show_all_members else 3
-            for constructor in constructors[:constructor_limit]:
-                signature = constructor.get("signature", "")
-                console.print(f"  • [cyan]{symbol_name}[/cyan] {signature}")
+            console.print("\n".join([f"  • [cyan]{symbol_name}[/cyan] {constructor.get('signature', '')}"
+                                     for constructor in constructors[:constructor_limit]]))
             if len(constructors) > constructor_limit:
                 console.print(f"  ... and {len(constructors) - constructor_limit} more constructors")
         
         # Show destructors
-        destructors = members.get("destructors", [])
         if destructors:
             console.print(f"[bold]Destructors ({len(destructors)}):[/bold]")
-            for destructor in destructors:
-                signature = destructor.get("signature", "")
-                console.print(f"  • [cyan]~{symbol_name}[/cyan] {signature}")
+            console.print("\n".join([f"  • [cyan]~{symbol_name}[/cyan] {destructor.get('signature', '')}"
+                                     for destructor in destructors]))
         
         # Show operators
-        operators = members.get("operators", [])
         if operators:
             console.print(f"[bold]Operators ({len(operators)}):[/bold]")
             operator_limit = len(operators) if show_all_members else 3
-            for operator in operators[:operator_limit]:
-                name = operator.get("name", "Unknown")
-                signature = operator.get("signature", "")
-                console.print(f"  • [cyan]{name}[/cyan] {signature}")
+            console.print("\n".join([f"  • [cyan]{operator.get('name', 'Unknown')}[/cyan] {operator.get('signature', '')}"
+                                     for operator in operators[:operator_limit]]))
             if len(operators) > operator_limit:
                 console.print(f"  ... and {len(operators) - operator_limit} more operators")
 
 
+PROVIDER_ICONS = {"cmake": "🔨", "meson": "⚡"}
+_SUFFIXES = ("_BINARY_DIR", "_SOURCE_DIR")
+
+
+def _important_options(build_options: Dict, _suffixes: tuple = _SUFFIXES):
+    """Yield up to 5 'key: value' lines worth showing, then how many more there are"""
+    count = 0
+    for key, value in build_options.items():
+        if key.endswith(_suffixes):
+            continue
+        text = value if isinstance(value, str) else str(value)
+        if len(text) >= 100:
+            continue
+        count += 1
+        if count <= 5:
+            yield f"{key}: {text}"
+    if count > 5:
+        yield f"... and {count - 5} more"
+
+
+def _build_dir_key(component: Dict) -> str:
+    """Sort key listing components by build directory"""
+    return component.get("build_dir_path") or ""
+
+
 def _format_project_details(console, data: Dict) -> None:
     """Format comprehensive project details including components and global configuration"""
     project_root_path = data.get("project_root_path", "Unknown")
@@ -955,20 +1526,20 @@ def _format_project_details(console, data: Dict) -> None:
     # Compute values client-side
     project_name = "Unknown"
     if project_root_path != "Unknown":
-        import os
         project_name = os.path.basename(str(project_root_path)) or "Unknown"
     
     component_count = len(components)
     
-    # Extract unique provider types from components
-    provider_types = []
-    if components:
-        provider_set = set(comp.get("provider_type", "unknown") for comp in components)
-        provider_types = sorted(list(provider_set))
+    # Group components by provider type; the keys double as the provider list
+    components_by_provider = defaultdict(list)
+    for component in components:
+        components_by_provider[component.get("provider_type", "unknown")].append(component)
+    provider_types = sorted(components_by_provider)
     
     # Project header with multi-provider info
     if project_name != "Unknown":
         providers_text = f" • {', '.join(provider_types)}" if provider_types else ""
+        Panel = _rich("Panel")
         console.print(Panel(f"[bold cyan]Project: {project_name}[/bold cyan]{providers_text}", 
                            title="Project Details Analysis", border_style="blue"))
         
@@ -996,57 +1567,34 @@ def _format_project_details(console, data: Dict) -> None:
     console.print(f"[dim]Provider types: {', '.join(provider_types)}[/dim]")
     console.print()
     
-    # Group components by provider type
-    components_by_provider = {}
-    for component in components:
-        provider = component.get("provider_type", "unknown")
-        if provider not in components_by_provider:
-            components_by_provider[provider] = []
-        components_by_provider[provider].append(component)
-    
-    # Display components grouped by provider
-    for provider_type, provider_components in components_by_provider.items():
-        provider_icon = "🔨" if provider_type == "cmake" else "⚡" if provider_type == "meson" else "🔧"
-        console.print(f"[bold yellow]{provider_icon} {provider_type.upper()} Components ({len(provider_components)}):[/bold yellow]")
+    # Display components grouped by provider, both in a stable order so
+    # repeated runs print the same tables
+    for provider_type in provider_types:
+        provider_components = sorted(components_by_provider[provider_type], key=_build_dir_key)
+        if not provider_components:
+            continue  # No header or table for a provider without components
+        
+        provider_icon = PROVIDER_ICONS.get(provider_type, "🔧")
+        table = _new_table("get-project-details")
+        table.title = f"{provider_icon} {provider_type.upper()} Components ({len(provider_components)})"
         
         for i, component in enumerate(provider_components, 1):
-            build_path = component.get("build_dir_path", "Unknown")
-            source_path = component.get("source_root_path", "Unknown")
-            generator = component.get("generator", "Unknown")
-            build_type = component.get("build_type", "Unknown")
-            
-            console.print(f"  [bold cyan]{i}. {build_path}[/bold cyan]")
-            
-            if source_path != "Unknown":
-                console.print(f"     Source Root: {source_path}")
-            if generator != "Unknown":
-                console.print(f"     Generator: {generator}")
-            if build_type != "Unknown":
-                console.print(f"     Build Type: {build_type}")
-            
+            get = component.get
             # Check if compilation database exists
-            compile_db_path = component.get("compilation_database_path", "")
-            if compile_db_path:
-                console.print(f"     Compile DB: ✓ {compile_db_path}")
-            else:
-                console.print(f"     Compile DB: ✗ Not found")
+            compile_db_path = get("compilation_database_path", "")
+            compile_db = f"✓ {compile_db_path}" if compile_db_path else "✗ Not found"
             
-            # Show build options if available (limit to important ones)
-            build_options = component.get("build_options", {})
-            if build_options:
-                important_options = {k: v for k, v in build_options.items() 
-                                   if not k.endswith(("_BINARY_DIR", "_SOURCE_DIR")) and len(str(v)) < 100}
-                if important_options:
-                    console.print("     [dim]Build Options:[/dim]")
-                    for key, value in list(important_options.items())[:5]:  # Limit to 5 options
-                        console.print(f"       {key}: {value}")
-                    if len(important_options) > 5:
-                        console.print(f"       ... and {len(important_options) - 5} more")
-            
-            console.print()
+            table.add_row(str(i),
+                          get("build_dir_path", "Unknown"),
+                          get("source_root_path") or "",
+                          get("generator") or "",
+                          get("build_type") or "",
+                          compile_db,
+                          # Show build options (limit to important ones)
+                          "\n".join(_important_options(get("build_options") or {})))
         
+        console.print(table)
         console.print()
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
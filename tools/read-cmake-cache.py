@@ -3,61 +3,62 @@
 Simple ccmake-like cache viewer - shows only user-configurable, non-advanced entries
 """
 
+import re
 import sys
 import os
 
+# The cache is scanned as bytes: only the fields of entries that are shown
+# get decoded, not the comments, internals and advanced markers around them
+EXTERNAL_MARKER = b"# EXTERNAL cache entries"
+INTERNAL_MARKER = b"# INTERNAL cache entries"
+
+# Cache entries: KEY:TYPE=VALUE, leading whitespace ignored (values get their
+# trailing whitespace stripped). The key runs up to the first ':' and may not
+# contain '='; lines starting with '//' or '#' are comments
+ENTRY_RE = re.compile(rb'^(?![^\S\n]*(?://|#))[^\S\n]*([^:=\n]*):([^=\n]*)=(.*)$', re.M)
+# Internal entries marking an external one as advanced: KEY-ADVANCED:TYPE=1
+ADVANCED_RE = re.compile(rb'^[^\S\n]*([^:=\n]*)-ADVANCED:[^=\n]*=1[^\S\n]*$', re.M)
+
+# Entry types shown to the user
+USER_TYPES = frozenset({'STRING', 'BOOL', 'PATH', 'FILEPATH'})
+
+def next_line(text, pos):
+    """Return the offset of the line after the one containing pos"""
+    end = text.find(b'\n', pos)
+    return len(text) if end < 0 else end + 1
+
 def parse_cmake_cache(cache_file):
-    """Parse CMakeCache.txt and return external entries and advanced properties"""
-    external_entries = {}
-    advanced_entries = set()
-    
+    """Parse CMakeCache.txt and return its user-configurable, non-advanced
+    entries as a key -> value dict"""
     try:
-        with open(cache_file, 'r') as f:
-            in_external = False
-            in_internal = False
-            
-            for line in f:
-                line = line.strip()
-                
-                # Section markers
-                if "# EXTERNAL cache entries" in line:
-                    in_external = True
-                    continue
-                elif "# INTERNAL cache entries" in line:
-                    in_external = False
-                    in_internal = True
-                    continue
-                
-                # Skip comments and empty lines
-                if not line or line.startswith('//') or line.startswith('#'):
-                    continue
-                
-                # Parse cache entries: KEY:TYPE=VALUE
-                if ':' in line and '=' in line:
-                    colon_pos = line.find(':')
-                    equals_pos = line.find('=')
-                    if colon_pos < equals_pos:
-                        key = line[:colon_pos]
-                        type_part = line[colon_pos+1:equals_pos]
-                        value = line[equals_pos+1:]
-                        
-                        if in_external:
-                            # Store external entries
-                            external_entries[key] = {
-                                'type': type_part,
-                                'value': value
-                            }
-                        elif in_internal and key.endswith('-ADVANCED'):
-                            # Track advanced properties
-                            if value == '1':
-                                original_key = key[:-9]  # Remove '-ADVANCED'
-                                advanced_entries.add(original_key)
-    
+        with open(cache_file, 'rb') as f:
+            text = f.read()
     except FileNotFoundError:
         print(f"Error: CMakeCache.txt not found at {cache_file}")
         sys.exit(1)
     
-    return external_entries, advanced_entries
+    # Slice the file into its sections instead of tracking them per line:
+    # externals run from the line after their marker up to the internal
+    # marker's line, internals from the line after that to the end
+    internal_marker = text.find(INTERNAL_MARKER)
+    if internal_marker < 0:
+        external_end = internal = len(text)
+    else:
+        external_end = text.rfind(b'\n', 0, internal_marker) + 1
+        internal = next_line(text, internal_marker)
+    external_marker = text.find(EXTERNAL_MARKER, 0, external_end)
+    external = next_line(text, external_marker) if external_marker >= 0 else external_end
+    
+    # Collect the advanced markers first so the external entries can be
+    # filtered as they are parsed: most of them (static, internal, advanced)
+    # are never shown
+    advanced_entries = set(ADVANCED_RE.findall(text, internal))
+    
+    return {
+        key.decode(): value.rstrip().decode()
+        for key, type_part, value in ENTRY_RE.findall(text, external, external_end)
+        if key not in advanced_entries and is_user_configurable(key, type_part.decode())
+    }
 
 def is_user_configurable(key, entry_type):
     """Determine if entry should be shown to user"""
@@ -68,19 +69,11 @@ def is_user_configurable(key, entry_type):
         return False
     
     # Include common user-configurable types
-    user_types = {'STRING', 'BOOL', 'PATH', 'FILEPATH'}
-    return entry_type in user_types
+    return entry_type in USER_TYPES
 
 def display_cache_entries(cache_file):
     """Display non-advanced, user-configurable cache entries"""
-    external_entries, advanced_entries = parse_cmake_cache(cache_file)
-    
-    # Filter and display entries
-    shown_entries = []
-    
-    for key, entry in external_entries.items():
-        if key not in advanced_entries and is_user_configurable(key, entry['type']):
-            shown_entries.append((key, entry['value']))
+    shown_entries = sorted(parse_cmake_cache(cache_file).items())
     
     # Display results
     if not shown_entries:
@@ -93,12 +86,11 @@ def display_cache_entries(cache_file):
     # Find max key length for alignment
     max_key_len = max(len(key) for key, _ in shown_entries)
     
-    for key, value in sorted(shown_entries):
-        # Display format similar to ccmake
-        if value:
-            print(f" {key:<{max_key_len}} {value}")
-        else:
-            print(f" {key}")
+    # Display format similar to ccmake, written out at once
+    sys.stdout.write("".join([
+        f" {key.ljust(max_key_len)} {value}\n" if value else f" {key}\n"
+        for key, value in shown_entries
+    ]))
 
 if __name__ == "__main__":
     # Default to current directory's CMakeCache.txt